@@ -0,0 +1,39 @@
+"""Drop redundant indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15
+
+Index changes on populated tables run outside the migration transaction with
+CONCURRENTLY so they don't block reads and writes while they build.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+# Single-column indexes whose column leads a composite index:
+# name -> (table, column, covering composite)
+REDUNDANT_INDEXES = {
+    'ix_api_keys_user_id': ('api_keys', 'user_id', 'idx_api_key_user_active'),
+    'ix_usage_logs_user_id': ('usage_logs', 'user_id', 'idx_usage_user_created'),
+    'ix_usage_logs_api_key_id': ('usage_logs', 'api_key_id', 'idx_usage_apikey_created'),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in REDUNDANT_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, column, _) in REDUNDANT_INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})')
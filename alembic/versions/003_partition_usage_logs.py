@@ -0,0 +1,118 @@
+"""Partition usage_logs by month
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15
+
+Rebuilds usage_logs as a table range-partitioned on created_at, with one
+partition per month and a default partition for anything outside them. Old
+months can then be pruned with DETACH PARTITION instead of a DELETE scan.
+The standalone ix_usage_logs_created_at index is not recreated.
+
+The existing rows are copied into the new table while it is locked, so run
+this in a maintenance window on large installations.
+
+"""
+from datetime import date, datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'id, user_id, api_key_id, endpoint, file_type, file_size, '
+    'processing_time, tokens_used, status_code, error_message, created_at'
+)
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _create_month_partition(month: date) -> None:
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS usage_logs_y{month:%Y}m{month:%m} "
+        f"PARTITION OF usage_logs "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE usage_logs RENAME TO usage_logs_old')
+    op.execute('ALTER TABLE usage_logs_old RENAME CONSTRAINT usage_logs_pkey TO usage_logs_old_pkey')
+    op.execute('DROP INDEX IF EXISTS ix_usage_logs_created_at')
+    op.execute('DROP INDEX IF EXISTS idx_usage_user_created')
+    op.execute('DROP INDEX IF EXISTS idx_usage_apikey_created')
+
+    # The partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE usage_logs (
+            id INTEGER NOT NULL DEFAULT nextval('usage_logs_id_seq'),
+            user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            api_key_id UUID REFERENCES api_keys (id) ON DELETE SET NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            file_type VARCHAR(50),
+            file_size INTEGER,
+            processing_time FLOAT,
+            tokens_used INTEGER NOT NULL,
+            status_code INTEGER NOT NULL,
+            error_message TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('ALTER SEQUENCE usage_logs_id_seq OWNED BY usage_logs.id')
+    op.execute('CREATE TABLE usage_logs_default PARTITION OF usage_logs DEFAULT')
+
+    # One partition per month from the oldest row through next month
+    oldest = op.get_bind().execute(sa.text('SELECT min(created_at) FROM usage_logs_old')).scalar()
+    now = datetime.now(timezone.utc)
+    month = _month_start((oldest or now).date())
+    last = _next_month(_month_start(now.date()))
+    while month <= last:
+        _create_month_partition(month)
+        month = _next_month(month)
+
+    op.execute(f'INSERT INTO usage_logs ({COLUMNS}) SELECT {COLUMNS} FROM usage_logs_old')
+    op.execute('DROP TABLE usage_logs_old')
+
+    op.create_index('idx_usage_user_created', 'usage_logs', ['user_id', 'created_at'])
+    op.create_index('idx_usage_apikey_created', 'usage_logs', ['api_key_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE usage_logs RENAME TO usage_logs_partitioned')
+    op.execute('ALTER TABLE usage_logs_partitioned RENAME CONSTRAINT usage_logs_pkey TO usage_logs_partitioned_pkey')
+    op.execute('DROP INDEX IF EXISTS idx_usage_user_created')
+    op.execute('DROP INDEX IF EXISTS idx_usage_apikey_created')
+
+    op.execute("""
+        CREATE TABLE usage_logs (
+            id INTEGER NOT NULL DEFAULT nextval('usage_logs_id_seq') PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            api_key_id UUID REFERENCES api_keys (id) ON DELETE SET NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            file_type VARCHAR(50),
+            file_size INTEGER,
+            processing_time FLOAT,
+            tokens_used INTEGER NOT NULL,
+            status_code INTEGER NOT NULL,
+            error_message TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+    """)
+    op.execute('ALTER SEQUENCE usage_logs_id_seq OWNED BY usage_logs.id')
+    op.execute(f'INSERT INTO usage_logs ({COLUMNS}) SELECT {COLUMNS} FROM usage_logs_partitioned')
+    op.execute('DROP TABLE usage_logs_partitioned CASCADE')
+
+    op.create_index('ix_usage_logs_created_at', 'usage_logs', ['created_at'])
+    op.create_index('idx_usage_user_created', 'usage_logs', ['user_id', 'created_at'])
+    op.create_index('idx_usage_apikey_created', 'usage_logs', ['api_key_id', 'created_at'])
@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15
+
+Listings page through rows ordered by (created_at DESC, id DESC); a B-tree on
+(created_at, id) serves that order with a backward scan.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_created_id ON users (created_at, id)')
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_key_user_created_id ON api_keys (user_id, created_at, id)')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_api_key_user_created_id')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_user_created_id')
@@ -0,0 +1,50 @@
+"""Add usage log grouping indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15
+
+Per-key usage stats group by endpoint and by file type. usage_logs is
+partitioned, and CREATE INDEX CONCURRENTLY can't target a partitioned table,
+so each index is created on the parent only, built concurrently on every
+partition and attached. Partitions created later inherit it automatically.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# name -> (partition index suffix, columns)
+INDEXES = {
+    'idx_usage_apikey_endpoint': ('apikey_endpoint', 'api_key_id, endpoint'),
+    'idx_usage_apikey_file_type': ('apikey_file_type', 'api_key_id, file_type'),
+}
+
+
+def _partitions() -> list[str]:
+    result = op.get_bind().execute(sa.text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits "
+        "WHERE inhparent = 'usage_logs'::regclass"
+    ))
+    return list(result.scalars())
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        partitions = _partitions()
+        for name, (suffix, columns) in INDEXES.items():
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON ONLY usage_logs ({columns})')
+            for partition in partitions:
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{suffix} ON {partition} ({columns})')
+                op.execute(f'ALTER INDEX {name} ATTACH PARTITION {partition}_{suffix}')
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes too
+    for name in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
@@ -0,0 +1,313 @@
+"""Redis-backed caches for hot request paths."""
+
+import json
+import time
+import uuid
+import zlib
+import asyncio
+import hashlib
+import logging
+import functools
+from datetime import datetime
+from typing import Any, Callable, Optional
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal
+from app.models import User, APIKey, UserRole
+
+
+logger = logging.getLogger(__name__)
+
+
+def _dt_to_str(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _str_to_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class AuthCache:
+    """
+    Cache API key and user lookups made on every authenticated request.
+
+    Entries are short-lived (AUTH_CACHE_TTL) and must be invalidated when the
+    underlying row changes. Redis errors are treated as cache misses so that
+    authentication falls back to the database.
+    """
+
+    API_KEY_PREFIX = "authkey:"
+    USER_PREFIX = "user:"
+
+    def __init__(self, ttl: int = settings.AUTH_CACHE_TTL):
+        self.ttl = ttl
+
+    async def _get(self, key: str) -> Optional[dict]:
+        try:
+            value = await get_redis().get(key)
+        except Exception as e:
+            logger.warning("Auth cache read failed: %s", e)
+            return None
+        return json.loads(value) if value else None
+
+    async def _set(self, key: str, value: dict):
+        try:
+            await get_redis().setex(key, self.ttl, json.dumps(value))
+        except Exception as e:
+            logger.warning("Auth cache write failed: %s", e)
+
+    async def _delete(self, key: str):
+        try:
+            await get_redis().delete(key)
+        except Exception as e:
+            logger.warning("Auth cache invalidation failed: %s", e)
+
+    async def get_api_key(self, key_hash: str) -> Optional[dict]:
+        """Get the cached entry for an API key hash."""
+        return await self._get(self.API_KEY_PREFIX + key_hash)
+
+    @staticmethod
+    def api_key_entry(api_key: APIKey) -> dict:
+        """Build the cache entry for an API key row."""
+        return {
+            "id": str(api_key.id),
+            "user_id": str(api_key.user_id),
+            "is_active": api_key.is_active,
+            "expires_at": _dt_to_str(api_key.expires_at),
+        }
+
+    async def set_api_key(self, key_hash: str, entry: dict):
+        """Cache the entry for an API key hash."""
+        await self._set(self.API_KEY_PREFIX + key_hash, entry)
+
+    async def invalidate_api_key(self, key_hash: str):
+        """Drop the cached entry for an API key hash."""
+        await self._delete(self.API_KEY_PREFIX + key_hash)
+
+    async def load_user(self, db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
+        """
+        Load a user, serving it from the cache when possible.
+
+        Cached users are attached to the session without a SELECT, so handlers
+        can modify and commit them as usual. The password hash is never cached.
+        """
+        entry = await self._get(f"{self.USER_PREFIX}{user_id}")
+        if entry is None:
+            # Session.get checks the identity map before querying
+            user = await db.get(User, user_id)
+            if user is not None:
+                await self._set(f"{self.USER_PREFIX}{user_id}", {
+                    "id": str(user.id),
+                    "email": user.email,
+                    "role": UserRole(user.role).value,
+                    "is_active": user.is_active,
+                    "quota_limit": user.quota_limit,
+                    "created_at": _dt_to_str(user.created_at),
+                    "updated_at": _dt_to_str(user.updated_at),
+                })
+            return user
+
+        user = User(
+            id=uuid.UUID(entry["id"]),
+            email=entry["email"],
+            role=UserRole(entry["role"]),
+            is_active=entry["is_active"],
+            quota_limit=entry["quota_limit"],
+            created_at=_str_to_dt(entry["created_at"]),
+            updated_at=_str_to_dt(entry["updated_at"]),
+        )
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    async def invalidate_user(self, user_id: uuid.UUID):
+        """Drop the cached entry for a user."""
+        await self._delete(f"{self.USER_PREFIX}{user_id}")
+
+
+auth_cache = AuthCache()
+
+
+class OCRResultCache:
+    """
+    Cache extraction results by document content.
+    
+    Parsing depends only on the file's bytes and extension, so re-uploads of
+    the same document skip parsing and OCR. Entries are scoped to the
+    uploading user; a shared entry would let a fast response reveal that
+    another tenant uploaded the same document. Results are stored
+    zlib-compressed. Redis errors are treated as cache misses.
+    """
+    
+    PREFIX = "ocr:"
+    
+    def __init__(self, ttl: int = settings.OCR_RESULT_CACHE_TTL):
+        self.ttl = ttl
+    
+    def key(self, user_id: uuid.UUID, digest: str, suffix: str) -> str:
+        """Build the Redis key for a user's document by content digest and extension."""
+        return f"{self.PREFIX}{user_id}:{digest}{suffix.lower()}"
+    
+    @staticmethod
+    def _pack(content: str, mime_type: str) -> bytes:
+        return zlib.compress(json.dumps({"content": content, "mime_type": mime_type}).encode())
+    
+    @staticmethod
+    def _unpack(value: bytes) -> tuple[str, str]:
+        entry = json.loads(zlib.decompress(value))
+        return entry["content"], entry["mime_type"]
+    
+    async def get(self, key: str) -> Optional[tuple[str, str]]:
+        """Get the cached (content, mime_type) for a key."""
+        try:
+            value = await get_redis().get(key)
+        except Exception as e:
+            logger.warning("OCR result cache read failed: %s", e)
+            return None
+        if value is None:
+            return None
+        return await asyncio.to_thread(self._unpack, value)
+    
+    async def set(self, key: str, content: str, mime_type: str):
+        """Cache an extraction result."""
+        value = await asyncio.to_thread(self._pack, content, mime_type)
+        try:
+            await get_redis().setex(key, self.ttl, value)
+        except Exception as e:
+            logger.warning("OCR result cache write failed: %s", e)
+
+
+ocr_result_cache = OCRResultCache()
+
+
+class ResponseCache:
+    """
+    Cache endpoint results in Redis with stale-while-revalidate.
+    
+    An entry is fresh for ttl seconds and then served stale for up to
+    stale_ttl more while a single background task recomputes it; if that
+    refresh fails, the stale entry keeps being served until it expires.
+    Redis errors are treated as cache misses.
+    """
+    
+    PREFIX = "resp:"
+    
+    def __init__(self):
+        self._refreshing: dict[str, asyncio.Task] = {}
+    
+    def key(self, namespace: str, params: str = "") -> str:
+        """Build the Redis key for a namespace and its cache-relevant params."""
+        digest = hashlib.blake2b(params.encode(), digest_size=8).hexdigest()
+        return f"{self.PREFIX}{namespace}:{digest}"
+    
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            entry = await get_redis().hgetall(key)
+        except Exception as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+        if not entry:
+            return None
+        return {
+            "value": json.loads(entry[b"value"]),
+            "generated_at": float(entry[b"generated_at"]),
+        }
+    
+    async def set(self, key: str, value: Any, ttl: int, stale_ttl: int):
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"value": json.dumps(value), "generated_at": time.time()})
+                pipe.expire(key, ttl + stale_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
+    
+    async def invalidate(self, *namespaces: str):
+        """Drop every cached entry in the given namespaces."""
+        try:
+            redis = get_redis()
+            for namespace in namespaces:
+                keys = [key async for key in redis.scan_iter(match=f"{self.PREFIX}{namespace}:*")]
+                if keys:
+                    await redis.delete(*keys)
+        except Exception as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+    
+    def refresh_in_background(self, key: str, compute: Callable):
+        """Recompute an entry in a background task, at most once at a time per key."""
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(compute())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+
+response_cache = ResponseCache()
+
+
+def cached(
+    namespace: str,
+    ttl: int,
+    response_model: Any,
+    stale_ttl: Optional[int] = None,
+    key: Optional[Callable[[dict], Optional[str]]] = None,
+):
+    """
+    Cache an endpoint's result in Redis.
+    
+    Apply below the route decorator. The result is serialized once through
+    response_model and returned as an ORJSONResponse, so FastAPI does not
+    validate it again and cache hits return the same JSON as a fresh call.
+    `key` maps the endpoint's arguments to the cache-relevant part of the
+    request, or to None to bypass the cache. Background refreshes run the
+    handler with a fresh `db` session, since the request's one is closed by
+    then.
+    """
+    adapter = TypeAdapter(response_model)
+    stale_ttl = ttl * 5 if stale_ttl is None else stale_ttl
+    
+    def dump(result: Any) -> Any:
+        return adapter.dump_python(
+            adapter.validate_python(result, from_attributes=True), mode="json"
+        )
+    
+    def decorator(func):
+        async def compute(cache_key: str, kwargs: dict) -> Any:
+            value = dump(await func(**kwargs))
+            await response_cache.set(cache_key, value, ttl, stale_ttl)
+            return value
+        
+        async def refresh(cache_key: str, kwargs: dict):
+            try:
+                if "db" in kwargs:
+                    async with AsyncSessionLocal() as session:
+                        await compute(cache_key, {**kwargs, "db": session})
+                else:
+                    await compute(cache_key, kwargs)
+            except Exception:
+                logger.exception("Background refresh of %s failed", cache_key)
+        
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            params = key(kwargs) if key else ""
+            if params is None:
+                return ORJSONResponse(dump(await func(**kwargs)))
+            
+            cache_key = response_cache.key(namespace, params)
+            entry = await response_cache.get(cache_key)
+            if entry is not None:
+                if time.time() - entry["generated_at"] >= ttl:
+                    response_cache.refresh_in_background(
+                        cache_key, functools.partial(refresh, cache_key, kwargs)
+                    )
+                return ORJSONResponse(entry["value"])
+            
+            return ORJSONResponse(await compute(cache_key, kwargs))
+        
+        return wrapper
+    
+    return decorator
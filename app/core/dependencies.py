@@ -2,27 +2,31 @@
 '''FastAPI dependencies for authentication and authorization.'''
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import User, APIKey, UserRole
-from app.core.security import decode_access_token, verify_api_key
+from app.models import User, APIKey
+from app.core.cache import auth_cache
+from app.core.security import decode_access_token, hash_api_key, verify_api_key, utc_now
+from app.services.usage import record_api_key_use
 from app.schemas import TokenData
 
 
-security = HTTPBearer()
+security = HTTPBearer(auto_error=False)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
-async def get_current_user_from_token(
-    credentials: HTTPAuthorizationCredentials = Security(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+def get_now(request: Request) -> datetime:
+    '''Get the request's timestamp, taken once when the request arrived.'''
+    return getattr(request.state, "now", None) or utc_now()
+
+
+async def get_current_user_from_token(token: str, db: AsyncSession) -> User:
     '''Get current user from JWT token.'''
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,7 +34,7 @@ async def get_current_user_from_token(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_access_token(credentials.credentials)
+    payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
 
@@ -38,11 +42,8 @@ async def get_current_user_from_token(
     if user_id is None:
         raise credentials_exception
 
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == uuid.UUID(user_id))
-    )
-    user = result.scalar_one_or_none()
+    # Get user from cache or database
+    user = await auth_cache.load_user(db, uuid.UUID(user_id))
 
     if user is None or not user.is_active:
         raise credentials_exception
@@ -51,48 +52,56 @@ async def get_current_user_from_token(
 
 
 async def get_current_user_from_api_key(
-    api_key: Optional[str] = Security(api_key_header),
-    db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+    api_key: str,
+    db: AsyncSession,
+    now: Optional[datetime] = None
+) -> User:
     '''Get current user from API key.'''
-    if not api_key:
-        return None
-
-    # Query all active API keys
-    result = await db.execute(
-        select(APIKey).where(APIKey.is_active == True)
-    )
-    api_keys = result.scalars().all()
-
-    # Find matching API key
-    matched_key = None
-    for key in api_keys:
-        if verify_api_key(api_key, key.key_hash):
-            matched_key = key
-            break
-
-    if not matched_key:
+    # Look up the key by its hash, from cache or the key_hash index
+    key_hash = hash_api_key(api_key)
+    cached_key = await auth_cache.get_api_key(key_hash)
+
+    if cached_key is None:
+        result = await db.execute(
+            select(APIKey).where(
+                APIKey.key_hash == key_hash,
+                APIKey.is_active == True
+            )
+        )
+        matched_key = result.scalar_one_or_none()
+
+        if not matched_key or not verify_api_key(api_key, matched_key.key_hash):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key"
+            )
+
+        cached_key = auth_cache.api_key_entry(matched_key)
+        await auth_cache.set_api_key(key_hash, cached_key)
+    elif not cached_key["is_active"]:
+        # Apply the same is_active check on a hit as the lookup query does
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key"
         )
 
-    # Check expiration
-    if matched_key.expires_at and matched_key.expires_at < datetime.utcnow():
+    now = now or utc_now()
+
+    # Check expiration; keys stored without a timezone are in UTC
+    expires_at = cached_key["expires_at"] and datetime.fromisoformat(cached_key["expires_at"])
+    if expires_at and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if expires_at and expires_at < now:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key has expired"
         )
 
-    # Update last_used_at
-    matched_key.last_used_at = datetime.utcnow()
-    await db.commit()
+    # Record usage; last_used_at is written in batches off the request path
+    record_api_key_use(uuid.UUID(cached_key["id"]), now)
 
     # Get user
-    result = await db.execute(
-        select(User).where(User.id == matched_key.user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await auth_cache.load_user(db, uuid.UUID(cached_key["user_id"]))
 
     if not user or not user.is_active:
         raise HTTPException(
@@ -104,19 +113,22 @@ async def get_current_user_from_api_key(
 
 
 async def get_current_user(
-    user_from_token: Optional[User] = Depends(get_current_user_from_token),
-    user_from_key: Optional[User] = Depends(get_current_user_from_api_key),
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(security),
+    api_key: Optional[str] = Security(api_key_header),
+    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(get_now)
 ) -> User:
     '''Get current user from either JWT token or API key.'''
-    user = user_from_token or user_from_key
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-
-    return user
+    # Only the credential actually presented is resolved
+    if credentials is not None:
+        return await get_current_user_from_token(credentials.credentials, db)
+    if api_key:
+        return await get_current_user_from_api_key(api_key, db, now)
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authenticated"
+    )
 
 
 async def get_current_active_user(
@@ -132,7 +144,7 @@ async def get_current_admin_user(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
     '''Get current user, verify they are an admin.'''
-    if current_user.role != UserRole.ADMIN:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
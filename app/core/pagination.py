@@ -0,0 +1,51 @@
+"""Keyset (cursor) pagination over (created_at, id)."""
+
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas import Cursor
+
+
+class PageParams:
+    """Query parameters for a paginated listing."""
+    
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=200, description="Maximum items per page"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ):
+        self.limit = limit
+        try:
+            self.cursor = Cursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+
+async def paginate(db: AsyncSession, stmt: Select, model, params: PageParams) -> dict:
+    """
+    Fetch one page of model rows, newest first.
+    
+    Rows are ordered by (created_at, id) descending and fetched from just past
+    the cursor, so each page is an index range scan regardless of its depth.
+    """
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(params.limit + 1)
+    if params.cursor is not None:
+        stmt = stmt.where(
+            tuple_(model.created_at, model.id) < tuple_(params.cursor.created_at, params.cursor.id)
+        )
+    
+    result = await db.execute(stmt)
+    items = list(result.scalars().all())
+    
+    next_cursor = None
+    if len(items) > params.limit:
+        items.pop()
+        last = items[-1]
+        next_cursor = Cursor(created_at=last.created_at, id=last.id).encode()
+    
+    return {"items": items, "next_cursor": next_cursor}
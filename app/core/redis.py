@@ -0,0 +1,48 @@
+"""Shared Redis connection pool."""
+
+from typing import Optional
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from app.config import settings
+
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Get the shared Redis client, creating it on first use.
+    
+    Replies are returned as raw bytes; callers parse what they need.
+    """
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            decode_responses=False
+        )
+    return _redis
+
+
+def get_redis_client(request: Request) -> aioredis.Redis:
+    """FastAPI dependency returning the client opened at startup."""
+    return getattr(request.app.state, "redis", None) or get_redis()
+
+
+async def init_redis() -> aioredis.Redis:
+    """Create the shared Redis client and open its first connection."""
+    redis = get_redis()
+    await redis.ping()
+    return redis
+
+
+async def close_redis():
+    """Close the shared Redis connection pool."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -1,20 +1,39 @@
 """Security utilities for authentication and password hashing."""
 
+import hmac
+import time
+import asyncio
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import jwt
+from cachetools import TTLCache
 from passlib.context import CryptContext
 from app.config import settings
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; bcrypt hashes still verify and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# Verified access token payloads, keyed by a digest of the token
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+
+def utc_now() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
+    """Hash a password using argon2id."""
     return pwd_context.hash(password)
 
 
@@ -23,6 +42,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash is outdated.
+    
+    Returns whether the password matched and, if the stored hash uses a
+    deprecated scheme or cost, the new hash to store in its place.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread, keeping the event loop free."""
+    return await asyncio.to_thread(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify and upgrade a password hash in a worker thread."""
+    return await asyncio.to_thread(verify_and_update_password, plain_password, hashed_password)
+
+
 def generate_api_key() -> str:
     """Generate a secure random API key."""
     # Generate 32 bytes (256 bits) of random data and convert to hex
@@ -35,8 +77,8 @@ def hash_api_key(api_key: str) -> str:
 
 
 def verify_api_key(plain_key: str, hashed_key: str) -> bool:
-    """Verify an API key against a hash."""
-    return hash_api_key(plain_key) == hashed_key
+    """Verify an API key against a hash in constant time."""
+    return hmac.compare_digest(hash_api_key(plain_key), hashed_key)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -53,9 +95,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = utc_now() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = utc_now() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
     # JWT is signed with SECRET_KEY using HS256 algorithm to prevent tampering
@@ -78,9 +120,9 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     to_encode = data.copy()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = utc_now() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        expire = utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
     to_encode.update({"exp": expire, "type": "refresh"})
     # JWT is signed with SECRET_KEY using HS256 algorithm
@@ -99,6 +141,12 @@ def decode_access_token(token: str) -> Optional[dict]:
     Returns:
         Dictionary of decoded claims if valid, None otherwise
     """
+    # Clients replay the same token until it expires; skip re-verifying it
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _token_cache.get(cache_key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    
     try:
         # Verify signature and decode - will raise exception if tampered
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -106,7 +154,8 @@ def decode_access_token(token: str) -> Optional[dict]:
         # Verify token type
         if payload.get("type") != "access":
             return None
-            
+        
+        _token_cache[cache_key] = payload
         return payload
     except jwt.PyJWTError:
         return None
@@ -0,0 +1,34 @@
+"""Static file serving with HTTP caching."""
+
+import os
+from starlette.responses import Response
+from starlette.staticfiles import PathLike, StaticFiles
+from starlette.types import Scope
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that lets browsers and proxies cache the assets it serves.
+    
+    HTML pages are always revalidated so a deploy shows up on the next load;
+    other assets are cached for max_age seconds. Both keep the ETag and
+    Last-Modified validators, so revalidation is a 304 without a body.
+    """
+    
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+    
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if str(full_path).endswith(".html"):
+            response.headers["Cache-Control"] = "no-cache"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
+        return response
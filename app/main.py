@@ -2,37 +2,84 @@
 '''Enterprise OCR Service - Main Application'''\
 
 import os
-from contextlib import asynccontextmanager
+import queue
+import asyncio
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from prometheus_client import make_asgi_app
 
 from app.config import settings
 from app.database import create_db_and_tables, close_db
+from app.core.redis import init_redis, close_redis
+from app.core.static import CachedStaticFiles
+from app.services.parsers import shutdown_worker_pool
+from app.services.usage import run_usage_flusher, run_usage_log_writer, run_partition_maintenance
 from app.routers.v1 import auth, users, api_keys, ocr as ocr_v1, health, admin
 from app.routers.v2 import ocr as ocr_v2
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.logging_middleware import LoggingMiddleware
 
 
+def configure_logging() -> tuple[QueueHandler, QueueListener]:
+    '''Route log records through a queue so handler I/O runs on a background thread.'''
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(settings.LOG_LEVEL)
+    queue_handler = QueueHandler(log_queue)
+    root_logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return queue_handler, listener
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     '''Application lifespan manager.'''
     # Startup
+    queue_handler, log_listener = configure_logging()
     print("🚀 Starting Enterprise OCR Service...")
     if settings.DEBUG:
         await create_db_and_tables()
         print("✓ Database tables created (dev mode)")
+    try:
+        app.state.redis = await init_redis()
+        print("✓ Redis connected")
+    except Exception as e:
+        print(f"⚠ Redis unavailable, rate limiting disabled until it recovers: {e}")
+    background_tasks = [
+        asyncio.create_task(run_usage_flusher()),
+        asyncio.create_task(run_usage_log_writer()),
+        asyncio.create_task(run_partition_maintenance()),
+    ]
     print("✓ Application started successfully")
 
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    print("✓ Usage data flushed")
     await close_db()
     print("✓ Database connections closed")
+    await close_redis()
+    print("✓ Redis connections closed")
+    await asyncio.to_thread(shutdown_worker_pool)
+    logging.getLogger().removeHandler(queue_handler)
+    log_listener.stop()
 
 
 # Create FastAPI app
@@ -43,6 +90,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -55,6 +103,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (mostly OCR text); small JSON isn't worth the CPU
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
+)
+
 # Custom middleware
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitMiddleware)
@@ -75,12 +130,20 @@ app.include_router(admin.router, prefix=settings.API_V1_PREFIX, tags=["Admin"])
 app.include_router(ocr_v2.router, prefix=settings.API_V2_PREFIX, tags=["OCR v2"])
 
 # Serve admin dashboard (mount BEFORE landing page to avoid conflicts)
-if os.path.exists("frontend/admin"):
-    app.mount("/admin", StaticFiles(directory="frontend/admin", html=True), name="admin")
+if settings.SERVE_FRONTEND and os.path.exists("frontend/admin"):
+    app.mount(
+        "/admin",
+        CachedStaticFiles(directory="frontend/admin", html=True, max_age=settings.STATIC_CACHE_MAX_AGE),
+        name="admin",
+    )
 
 # Serve frontend static files
-if os.path.exists("frontend/landing"):
-    app.mount("/", StaticFiles(directory="frontend/landing", html=True), name="landing")
+if settings.SERVE_FRONTEND and os.path.exists("frontend/landing"):
+    app.mount(
+        "/",
+        CachedStaticFiles(directory="frontend/landing", html=True, max_age=settings.STATIC_CACHE_MAX_AGE),
+        name="landing",
+    )
 
 
 @app.get("/api", include_in_schema=False)
@@ -1,30 +1,53 @@
 """Request/response logging middleware."""
 
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.security import utc_now
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+
+logger = logging.getLogger("ocr.access")
+
+
+class LoggingMiddleware:
     """Log all requests and responses."""
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process and log request/response."""
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        print(f"→ {request.method} {request.url.path}")
-        
-        # Process request
-        response = await call_next(request)
+        start_time = time.time()
+        method, path = scope["method"], scope["path"]
         
-        # Calculate processing time
-        process_time = time.time() - start_time
+        # Shared request timestamp, read back through request.state.now
+        scope.setdefault("state", {})["now"] = utc_now()
+        status_code = 500
         
-        # Log response
-        print(f"← {request.method} {request.url.path} - {response.status_code} ({process_time:.2f}s)")
+        # Log request
+        logger.info("→ %s %s", method, path)
         
-        # Add custom headers
-        response.headers["X-Process-Time"] = str(process_time)
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add custom headers
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.time() - start_time))
+            await send(message)
         
-        return response
+        # Process request
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Log response
+            logger.info(
+                "← %s %s - %s (%.2fs)",
+                method, path, status_code, time.time() - start_time
+            )
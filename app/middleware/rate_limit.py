@@ -1,69 +1,93 @@
 """Rate limiting middleware using Redis."""
 
 import time
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-import redis.asyncio as aioredis
+import logging
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import settings
+from app.core.redis import get_redis
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+logger = logging.getLogger(__name__)
+
+# Health checks and docs are never rate limited
+_SKIP_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json", "/metrics"})
+
+# INCR the window counter and start its TTL on the first hit, in one round-trip
+INCR_WITH_EXPIRE = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+
+class RateLimitMiddleware:
     """Rate limiting middleware."""
     
-    def __init__(self, app):
-        super().__init__(app)
-        self.redis = None
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._redis = None
+        self._incr_with_expire = None
     
-    async def get_redis(self):
-        """Get or create Redis connection."""
-        if self.redis is None:
-            self.redis = await aioredis.from_url(
-                settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True
-            )
-        return self.redis
+    def _get_counter_script(self):
+        """Get the rate limit script, registered against the shared client."""
+        redis = get_redis()
+        if redis is not self._redis:
+            # Script runs via EVALSHA and reloads itself on NOSCRIPT
+            self._incr_with_expire = redis.register_script(INCR_WITH_EXPIRE)
+            self._redis = redis
+        return self._incr_with_expire
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request and apply rate limiting."""
-        # Skip rate limiting for health checks and docs
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json", "/metrics"]:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
         # Get client identifier (API key or IP)
-        api_key = request.headers.get("X-API-Key")
-        client_id = api_key if api_key else request.client.host
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                api_key = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        client_id = api_key if api_key else (client[0] if client else "unknown")
         
         try:
-            redis = await self.get_redis()
-            
-            # Check per-minute rate limit
-            minute_key = f"rate_limit:{client_id}:minute:{int(time.time() // 60)}"
-            minute_count = await redis.incr(minute_key)
-            
-            if minute_count == 1:
-                await redis.expire(minute_key, 60)
-            
-            if minute_count > settings.RATE_LIMIT_PER_MINUTE:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded. Please try again later."
-                )
-            
-            response = await call_next(request)
+            incr_with_expire = self._get_counter_script()
             
-            # Add rate limit headers
-            response.headers["X-RateLimit-Limit"] = str(settings.RATE_LIMIT_PER_MINUTE)
-            response.headers["X-RateLimit-Remaining"] = str(
-                max(0, settings.RATE_LIMIT_PER_MINUTE - minute_count)
-            )
-            
-            return response
-            
-        except HTTPException:
-            raise
+            # Check per-minute rate limit; wall-clock minutes keep every host on the same window
+            minute_key = f"rate_limit:{client_id}:minute:{int(time.time()) // 60}"
+            minute_count = int(await incr_with_expire(keys=[minute_key], args=[60]))
         except Exception as e:
             # If Redis fails, allow the request but log error
-            print(f"Rate limiting error: {e}")
-            return await call_next(request)
+            logger.warning("Rate limiting error: %s", e)
+            await self.app(scope, receive, send)
+            return
+        
+        limit = str(settings.RATE_LIMIT_PER_MINUTE)
+        remaining = str(max(0, settings.RATE_LIMIT_PER_MINUTE - minute_count))
+        
+        if minute_count > settings.RATE_LIMIT_PER_MINUTE:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={"X-RateLimit-Limit": limit, "X-RateLimit-Remaining": remaining},
+            )
+            await response(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                # Add rate limit headers
+                headers = MutableHeaders(scope=message)
+                headers.append("X-RateLimit-Limit", limit)
+                headers.append("X-RateLimit-Remaining", remaining)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
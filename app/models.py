@@ -15,9 +15,11 @@ from sqlalchemy import (
     Text,
     Index,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
+from app.core.security import utc_now
 
 
 class UserRole(str, enum.Enum):
@@ -49,13 +51,13 @@ class User(Base):
     quota_limit: Mapped[int] = mapped_column(Integer, default=1000, nullable=False)  # requests per month
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
+        default=utc_now,
         nullable=False,
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        default=utc_now,
+        onupdate=utc_now,
         nullable=False,
     )
     
@@ -64,13 +66,26 @@ class User(Base):
         "APIKey",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
     usage_logs: Mapped[list["UsageLog"]] = relationship(
         "UsageLog",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
     
+    __table_args__ = (
+        Index("idx_user_created_id", "created_at", "id"),
+    )
+    
+    @hybrid_property
+    def is_admin(self) -> bool:
+        """Whether the user has the admin role."""
+        return self.role == UserRole.ADMIN
+    
     def __repr__(self) -> str:
         return f"<User {self.email} ({self.role})>"
 
@@ -91,14 +106,13 @@ class APIKey(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     rate_limit: Mapped[int] = mapped_column(Integer, default=60, nullable=False)  # requests per minute
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
+        default=utc_now,
         nullable=False,
     )
     expires_at: Mapped[Optional[datetime]] = mapped_column(
@@ -111,15 +125,18 @@ class APIKey(Base):
     )
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="api_keys")
+    user: Mapped["User"] = relationship("User", back_populates="api_keys", lazy="raise")
     usage_logs: Mapped[list["UsageLog"]] = relationship(
         "UsageLog",
         back_populates="api_key",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
     
     __table_args__ = (
         Index("idx_api_key_user_active", "user_id", "is_active"),
+        Index("idx_api_key_user_created_id", "user_id", "created_at", "id"),
     )
     
     def __repr__(self) -> str:
@@ -136,13 +153,11 @@ class UsageLog(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     api_key_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("api_keys.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
     endpoint: Mapped[str] = mapped_column(String(255), nullable=False)
     file_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -153,18 +168,19 @@ class UsageLog(Base):
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
+        default=utc_now,
         nullable=False,
-        index=True,
     )
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="usage_logs")
-    api_key: Mapped[Optional["APIKey"]] = relationship("APIKey", back_populates="usage_logs")
+    user: Mapped["User"] = relationship("User", back_populates="usage_logs", lazy="raise")
+    api_key: Mapped[Optional["APIKey"]] = relationship("APIKey", back_populates="usage_logs", lazy="raise")
     
     __table_args__ = (
         Index("idx_usage_user_created", "user_id", "created_at"),
         Index("idx_usage_apikey_created", "api_key_id", "created_at"),
+        Index("idx_usage_apikey_endpoint", "api_key_id", "endpoint"),
+        Index("idx_usage_apikey_file_type", "api_key_id", "file_type"),
     )
     
     def __repr__(self) -> str:
@@ -1,31 +1,38 @@
 """Admin endpoints for user and system management."""
 
 import uuid
-from typing import List
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import select, func, true, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.database import get_db
 from app.models import User, APIKey, UsageLog, UserRole
-from app.schemas import UserResponse, UserUpdate, AdminUsageStats
-from app.core.dependencies import get_current_admin_user
-from app.core.security import hash_password
+from app.schemas import UserResponse, UserUpdate, AdminUsageStats, Page
+from app.core.dependencies import get_current_admin_user, get_now
+from app.core.cache import auth_cache, response_cache, cached
+from app.core.pagination import PageParams, paginate
+from app.core.security import hash_password_async
 
 
 router = APIRouter(prefix="/admin")
 
 
-@router.get("/users", response_model=List[UserResponse])
+def _first_page_key(kwargs: dict):
+    page = kwargs["page"]
+    return None if page.cursor else f"limit={page.limit}"
+
+
+@router.get("/users", response_model=Page[UserResponse])
+@cached("admin:users", ttl=10, response_model=Page[UserResponse], key=_first_page_key)
 async def list_all_users(
+    page: PageParams = Depends(),
     admin_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all users (admin only)."""
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+    """List users, newest first, one page at a time (admin only)."""
+    return await paginate(db, select(User).options(raiseload("*")), User, page)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -35,10 +42,8 @@ async def get_user_by_id(
     db: AsyncSession = Depends(get_db)
 ):
     """Get user by ID (admin only)."""
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    # Served from the auth cache, which mutations below invalidate
+    user = await auth_cache.load_user(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -57,8 +62,13 @@ async def update_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Update user (admin only)."""
+    # Update fields and read the row back in one statement
+    values = user_update.model_dump(exclude_none=True, exclude={"password"})
+    if user_update.password is not None:
+        values["hashed_password"] = await hash_password_async(user_update.password)
+    
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        update(User).where(User.id == user_id).values(**values).returning(User)
     )
     user = result.scalar_one_or_none()
     
@@ -68,18 +78,9 @@ async def update_user(
             detail="User not found"
         )
     
-    # Update fields
-    if user_update.email is not None:
-        user.email = user_update.email
-    if user_update.password is not None:
-        user.hashed_password = hash_password(user_update.password)
-    if user_update.is_active is not None:
-        user.is_active = user_update.is_active
-    if user_update.quota_limit is not None:
-        user.quota_limit = user_update.quota_limit
-    
     await db.commit()
-    await db.refresh(user)
+    await auth_cache.invalidate_user(user.id)
+    await response_cache.invalidate("admin:users", "admin:stats")
     
     return user
 
@@ -91,84 +92,61 @@ async def delete_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete user (admin only)."""
+    # Prevent deleting yourself
+    if user_id == admin_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete your own account"
+        )
+    
+    # API keys and usage logs go with the user via ON DELETE CASCADE
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        delete(User).where(User.id == user_id).returning(User.id)
     )
-    user = result.scalar_one_or_none()
     
-    if not user:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Prevent deleting yourself
-    if user.id == admin_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete your own account"
-        )
-    
-    await db.delete(user)
     await db.commit()
+    await auth_cache.invalidate_user(user_id)
+    await response_cache.invalidate("admin:users", "admin:stats")
 
 
 @router.get("/stats", response_model=AdminUsageStats)
+@cached("admin:stats", ttl=30, response_model=AdminUsageStats)
 async def get_system_stats(
     admin_user: User = Depends(get_current_admin_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(get_now)
 ):
     """Get system-wide usage statistics (admin only)."""
-    # User counts
-    result = await db.execute(select(func.count(User.id)))
-    total_users = result.scalar()
-    
-    result = await db.execute(
-        select(func.count(User.id)).where(User.is_active == True)
-    )
-    active_users = result.scalar()
-    
-    # API key counts
-    result = await db.execute(select(func.count(APIKey.id)))
-    total_api_keys = result.scalar()
-    
-    result = await db.execute(
-        select(func.count(APIKey.id)).where(APIKey.is_active == True)
-    )
-    active_api_keys = result.scalar()
-    
-    # Usage logs
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    result = await db.execute(
-        select(func.count(UsageLog.id)).where(UsageLog.created_at >= today)
-    )
-    requests_today = result.scalar()
-    
-    result = await db.execute(
-        select(func.count(UsageLog.id)).where(UsageLog.created_at >= month_start)
-    )
-    requests_this_month = result.scalar()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today.replace(day=1)
+    
+    # One single-row aggregate per table, fetched together in one round-trip
+    user_counts = select(
+        func.count().label("total_users"),
+        func.count().filter(User.is_active == True).label("active_users"),
+    ).select_from(User).subquery()
+    
+    api_key_counts = select(
+        func.count().label("total_api_keys"),
+        func.count().filter(APIKey.is_active == True).label("active_api_keys"),
+    ).select_from(APIKey).subquery()
+    
+    usage_totals = select(
+        func.count().filter(UsageLog.created_at >= today).label("requests_today"),
+        func.count().filter(UsageLog.created_at >= month_start).label("requests_this_month"),
+        func.coalesce(func.sum(UsageLog.file_size), 0).label("total_file_size_processed"),
+        func.coalesce(func.avg(UsageLog.processing_time), 0.0).label("average_response_time"),
+    ).select_from(UsageLog).subquery()
     
-    # File size and response time
     result = await db.execute(
-        select(func.sum(UsageLog.file_size))
-    )
-    total_file_size_processed = result.scalar() or 0
-    
-    result = await db.execute(
-        select(func.avg(UsageLog.processing_time))
-    )
-    average_response_time = result.scalar() or 0.0
-    
-    return AdminUsageStats(
-        total_users=total_users,
-        active_users=active_users,
-        total_api_keys=total_api_keys,
-        active_api_keys=active_api_keys,
-        requests_today=requests_today,
-        requests_this_month=requests_this_month,
-        total_file_size_processed=total_file_size_processed,
-        average_response_time=average_response_time
+        select(user_counts, api_key_counts, usage_totals).select_from(
+            user_counts.join(api_key_counts, true()).join(usage_totals, true())
+        )
     )
+    return AdminUsageStats(**result.one()._mapping)
@@ -2,27 +2,35 @@
 
 import uuid
 from datetime import datetime, timedelta
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, func, delete
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.database import get_db
 from app.models import User, APIKey, UsageLog
-from app.schemas import APIKeyCreate, APIKeyResponse, APIKeyWithSecret, UsageStats
-from app.core.dependencies import get_current_active_user
+from app.schemas import APIKeyCreate, APIKeyResponse, APIKeyWithSecret, UsageStats, Page
+from app.core.dependencies import get_current_active_user, get_now
+from app.core.cache import auth_cache, response_cache
+from app.core.pagination import PageParams, paginate
 from app.core.security import generate_api_key, hash_api_key
 from app.config import settings
 
 
 router = APIRouter(prefix="/keys")
 
+API_KEY_PAGE_ADAPTER = TypeAdapter(Page[APIKeyResponse])
+
 
 @router.post("/create", response_model=APIKeyWithSecret, status_code=status.HTTP_201_CREATED)
 async def create_api_key(
     key_data: APIKeyCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(get_now)
 ):
     """Create a new API key."""
     # Generate API key
@@ -31,7 +39,7 @@ async def create_api_key(
     # Calculate expiration
     expires_at = None
     if key_data.expires_days:
-        expires_at = datetime.utcnow() + timedelta(days=key_data.expires_days)
+        expires_at = now + timedelta(days=key_data.expires_days)
     
     # Create API key record
     api_key = APIKey(
@@ -43,8 +51,10 @@ async def create_api_key(
     )
     
     db.add(api_key)
-    await db.commit()
-    await db.refresh(api_key)
+    await db.flush()
+    
+    # Runs after get_db has committed the new key
+    background_tasks.add_task(response_cache.invalidate, "admin:stats")
     
     # Return with plain key (only time it's shown!)
     return APIKeyWithSecret(
@@ -59,17 +69,23 @@ async def create_api_key(
     )
 
 
-@router.get("/", response_model=List[APIKeyResponse])
+@router.get("/", response_model=Page[APIKeyResponse])
 async def list_api_keys(
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all API keys for current user."""
-    result = await db.execute(
-        select(APIKey).where(APIKey.user_id == current_user.id)
+    """List API keys for current user, newest first, one page at a time."""
+    result = await paginate(
+        db,
+        select(APIKey).where(APIKey.user_id == current_user.id).options(raiseload("*")),
+        APIKey,
+        page,
     )
-    api_keys = result.scalars().all()
-    return api_keys
+    # Serialize once here instead of letting FastAPI validate and dump again
+    return ORJSONResponse(API_KEY_PAGE_ADAPTER.dump_python(
+        API_KEY_PAGE_ADAPTER.validate_python(result, from_attributes=True), mode="json"
+    ))
 
 
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -80,21 +96,24 @@ async def delete_api_key(
 ):
     """Delete an API key."""
     result = await db.execute(
-        select(APIKey).where(
+        delete(APIKey)
+        .where(
             APIKey.id == key_id,
             APIKey.user_id == current_user.id
         )
+        .returning(APIKey.key_hash)
     )
-    api_key = result.scalar_one_or_none()
+    key_hash = result.scalar_one_or_none()
     
-    if not api_key:
+    if key_hash is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="API key not found"
         )
     
-    await db.delete(api_key)
     await db.commit()
+    await auth_cache.invalidate_api_key(key_hash)
+    await response_cache.invalidate("admin:stats")
 
 
 @router.get("/{key_id}/usage", response_model=UsageStats)
@@ -106,10 +125,12 @@ async def get_api_key_usage(
     """Get usage statistics for an API key."""
     # Verify ownership
     result = await db.execute(
-        select(APIKey).where(
+        select(APIKey)
+        .where(
             APIKey.id == key_id,
             APIKey.user_id == current_user.id
         )
+        .options(raiseload("*"))
     )
     api_key = result.scalar_one_or_none()
     
@@ -119,34 +140,40 @@ async def get_api_key_usage(
             detail="API key not found"
         )
     
-    # Get usage logs
+    # Aggregate in the database; only per-group counts come back
+    key_filter = UsageLog.api_key_id == key_id
+    
     result = await db.execute(
-        select(UsageLog).where(UsageLog.api_key_id == key_id)
+        select(
+            func.count().label("total_requests"),
+            func.count().filter(UsageLog.status_code.between(200, 299)).label("successful_requests"),
+            func.coalesce(func.sum(UsageLog.file_size), 0).label("total_file_size"),
+            func.coalesce(func.avg(func.coalesce(UsageLog.processing_time, 0.0)), 0.0).label("average_processing_time"),
+        ).where(key_filter)
     )
-    logs = result.scalars().all()
-    
-    # Calculate statistics
-    total_requests = len(logs)
-    successful_requests = sum(1 for log in logs if 200 <= log.status_code < 300)
-    failed_requests = total_requests - successful_requests
-    total_file_size = sum(log.file_size or 0 for log in logs)
-    avg_processing_time = sum(log.processing_time or 0 for log in logs) / total_requests if total_requests > 0 else 0
+    totals = result.one()
     
     # Group by endpoint and file type
-    requests_by_endpoint = {}
-    requests_by_file_type = {}
+    result = await db.execute(
+        select(UsageLog.endpoint, func.count())
+        .where(key_filter)
+        .group_by(UsageLog.endpoint)
+    )
+    requests_by_endpoint = dict(result.all())
     
-    for log in logs:
-        requests_by_endpoint[log.endpoint] = requests_by_endpoint.get(log.endpoint, 0) + 1
-        if log.file_type:
-            requests_by_file_type[log.file_type] = requests_by_file_type.get(log.file_type, 0) + 1
+    result = await db.execute(
+        select(UsageLog.file_type, func.count())
+        .where(key_filter, UsageLog.file_type.is_not(None))
+        .group_by(UsageLog.file_type)
+    )
+    requests_by_file_type = dict(result.all())
     
     return UsageStats(
-        total_requests=total_requests,
-        successful_requests=successful_requests,
-        failed_requests=failed_requests,
-        total_file_size=total_file_size,
-        average_processing_time=avg_processing_time,
+        total_requests=totals.total_requests,
+        successful_requests=totals.successful_requests,
+        failed_requests=totals.total_requests - totals.successful_requests,
+        total_file_size=totals.total_file_size,
+        average_processing_time=totals.average_processing_time,
         requests_by_endpoint=requests_by_endpoint,
         requests_by_file_type=requests_by_file_type
     )
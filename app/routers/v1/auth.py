@@ -1,15 +1,17 @@
 """Authentication endpoints."""
 
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserResponse, Token, LoginRequest
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, verify_refresh_token
+from app.core.security import hash_password_async, verify_and_update_password_async, create_access_token, create_refresh_token, verify_refresh_token
 from app.core.dependencies import get_current_active_user
+from app.core.cache import response_cache
 from app.config import settings
 
 
@@ -17,28 +19,31 @@ router = APIRouter(prefix="/auth")
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(
+    user_data: UserCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """Register a new user."""
-    # Check if user exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Create user
+    # Create user; the unique index on email rejects duplicates
     user = User(
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         role=user_data.role or "user",
     )
     
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Runs after get_db has committed the new user
+    background_tasks.add_task(response_cache.invalidate, "admin:users", "admin:stats")
     
     return user
 
@@ -56,14 +61,22 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    # Verify password using bcrypt (NEVER stored in plain text)
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    # Verify password hash (NEVER stored in plain text)
+    verified, new_hash = (
+        await verify_and_update_password_async(login_data.password, user.hashed_password)
+        if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade legacy bcrypt hashes to argon2id
+    if new_hash:
+        user.hashed_password = new_hash
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -7,8 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import redis.asyncio as aioredis
 
 from app.database import get_db
+from app.core.redis import get_redis_client
 from app.config import settings
 from app.schemas import HealthResponse, HealthDetailResponse
+from app.core.cache import cached
 
 
 router = APIRouter()
@@ -25,7 +27,11 @@ async def health_check():
 
 
 @router.get("/health/details", response_model=HealthDetailResponse)
-async def detailed_health_check(db: AsyncSession = Depends(get_db)):
+@cached("health:details", ttl=5, response_model=HealthDetailResponse)
+async def detailed_health_check(
+    db: AsyncSession = Depends(get_db),
+    redis: aioredis.Redis = Depends(get_redis_client)
+):
     """Detailed health check including dependencies."""
     # Check database
     try:
@@ -36,10 +42,8 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
     
     # Check Redis
     try:
-        redis = await aioredis.from_url(settings.REDIS_URL)
         await redis.ping()
         redis_status = "healthy"
-        await redis.close()
     except Exception as e:
         redis_status = f"unhealthy: {str(e)}"
     
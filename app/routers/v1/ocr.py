@@ -1,27 +1,63 @@
 """OCR extraction endpoints - API v1."""
 
 import tempfile
+import asyncio
+import hashlib
 import os
 import time
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, HTTPException, Depends, status
+from fastapi.responses import ORJSONResponse
 
-from app.database import get_db
-from app.models import User, UsageLog
+from app.models import User
 from app.services.parsers import process_document, UnsupportedFileType, ParsingError
+from app.services.usage import record_usage_log
 from app.schemas import OCRResponse
 from app.core.dependencies import get_current_active_user
+from app.core.cache import ocr_result_cache
 from app.config import settings
 
 
 router = APIRouter(prefix="/ocr")
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class FileTooLarge(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE."""
+    pass
+
+
+def spool_upload(source: BinaryIO, suffix: str, max_size: int) -> tuple[str, int, str]:
+    """
+    Copy an upload to a named temp file in fixed-size chunks.
+    
+    Returns (path, size, sha256 hex digest). Stops and removes the file as
+    soon as the upload exceeds max_size, so oversized uploads are never fully
+    written.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                temp_file.write(chunk)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+    return temp_file.name, size, digest.hexdigest()
+
 
 @router.post("/extract", response_model=OCRResponse)
 async def extract_text(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
 ):
     """
     Extract text from an uploaded document.
@@ -29,35 +65,40 @@ async def extract_text(
     Supports: PDF, DOCX, XLSX, PPTX, images (PNG, JPG, TIFF), 
     ODT, RTF, HTML, EPUB, Markdown, CSV
     """
-    # Check file size
-    file_content = await file.read()
-    file_size = len(file_content)
+    suffix = os.path.splitext(file.filename)[1]
     
-    if file_size > settings.MAX_FILE_SIZE:
+    # Stream to a temp file off the event loop, checking size as we go
+    try:
+        temp_file_path, file_size, digest = await asyncio.to_thread(
+            spool_upload,
+            file.file,
+            suffix,
+            settings.MAX_FILE_SIZE,
+        )
+    except FileTooLarge:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
         )
     
-    # Create temporary file
-    temp_file_path = None
     start_time = time.time()
+    cleanup_now = True
     
     try:
-        # Write to temp file
-        with tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix=os.path.splitext(file.filename)[1]
-        ) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        # Process document
-        content, mime_type = process_document(temp_file_path)
+        # Identical uploads give identical results, so serve a user's repeats
+        # from cache
+        cache_key = ocr_result_cache.key(current_user.id, digest, suffix)
+        cached_result = await ocr_result_cache.get(cache_key)
+        if cached_result is not None:
+            content, mime_type = cached_result
+        else:
+            # Process document in a worker thread; parsing and OCR are blocking
+            content, mime_type = await asyncio.to_thread(process_document, temp_file_path)
+            background_tasks.add_task(ocr_result_cache.set, cache_key, content, mime_type)
         processing_time = time.time() - start_time
         
         # Log usage
-        usage_log = UsageLog(
+        record_usage_log(
             user_id=current_user.id,
             endpoint="/api/v1/ocr/extract",
             file_type=mime_type,
@@ -65,28 +106,37 @@ async def extract_text(
             processing_time=processing_time,
             status_code=200,
         )
-        db.add(usage_log)
-        await db.commit()
         
-        return OCRResponse(
-            filename=file.filename,
-            mime_type=mime_type,
-            content=content,
-            file_size=file_size,
-            processing_time=processing_time
+        # Encode straight to JSON; validating a multi-MB content string through
+        # OCRResponse would only copy it
+        # The MIME type is repeated in a header so clients can read it
+        # without decoding a possibly compressed body
+        response = ORJSONResponse(
+            {
+                "filename": file.filename,
+                "mime_type": mime_type,
+                "content": content,
+                "file_size": file_size,
+                "processing_time": processing_time,
+            },
+            headers={"X-OCR-MimeType": mime_type},
         )
         
+        # Remove the temp file after the response has been sent; only once
+        # it's built, since a failed encode becomes an error response
+        background_tasks.add_task(os.unlink, temp_file_path)
+        cleanup_now = False
+        return response
+        
     except UnsupportedFileType as e:
         # Log failed request
-        usage_log = UsageLog(
+        record_usage_log(
             user_id=current_user.id,
             endpoint="/api/v1/ocr/extract",
             file_size=file_size,
             status_code=415,
             error_message=str(e)
         )
-        db.add(usage_log)
-        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
@@ -95,15 +145,13 @@ async def extract_text(
         
     except ParsingError as e:
         # Log failed request
-        usage_log = UsageLog(
+        record_usage_log(
             user_id=current_user.id,
             endpoint="/api/v1/ocr/extract",
             file_size=file_size,
             status_code=422,
             error_message=str(e)
         )
-        db.add(usage_log)
-        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -112,15 +160,13 @@ async def extract_text(
         
     except Exception as e:
         # Log failed request
-        usage_log = UsageLog(
+        record_usage_log(
             user_id=current_user.id,
             endpoint="/api/v1/ocr/extract",
             file_size=file_size,
             status_code=500,
             error_message=str(e)
         )
-        db.add(usage_log)
-        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -128,6 +174,6 @@ async def extract_text(
         )
         
     finally:
-        # Clean up temp file
-        if temp_file_path and os.path.exists(temp_file_path):
+        # Error responses skip background tasks, so clean up here
+        if cleanup_now and os.path.exists(temp_file_path):
             os.unlink(temp_file_path)
@@ -7,7 +7,8 @@ from app.database import get_db
 from app.models import User
 from app.schemas import UserResponse, UserUpdate
 from app.core.dependencies import get_current_active_user
-from app.core.security import hash_password
+from app.core.cache import auth_cache, response_cache
+from app.core.security import hash_password_async
 
 
 router = APIRouter(prefix="/users")
@@ -24,9 +25,10 @@ async def update_current_user(
         current_user.email = user_update.email
     
     if user_update.password is not None:
-        current_user.hashed_password = hash_password(user_update.password)
+        current_user.hashed_password = await hash_password_async(user_update.password)
     
     await db.commit()
-    await db.refresh(current_user)
+    await auth_cache.invalidate_user(current_user.id)
+    await response_cache.invalidate("admin:users")
     
     return current_user
@@ -1,11 +1,47 @@
 """Pydantic schemas for request/response validation."""
 
 import uuid
+import base64
+import binascii
 from datetime import datetime
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 
+T = TypeVar("T")
+
+
+# ============================================================================
+# Pagination Schemas
+# ============================================================================
+
+class Cursor(BaseModel):
+    """Keyset position of the last row on a page: (created_at, id)."""
+    created_at: datetime
+    id: uuid.UUID
+    
+    def encode(self) -> str:
+        """Encode as an opaque URL-safe token."""
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        """Decode a token produced by encode(). Raises ValueError if malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            created_at, id_ = raw.split("|")
+            return cls(created_at=datetime.fromisoformat(created_at), id=uuid.UUID(id_))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError("Malformed cursor") from e
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of results and the cursor for the next one."""
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
 # ============================================================================
 # User Schemas
 # ============================================================================
@@ -2,21 +2,79 @@
 import csv
 import magic
 import pytesseract
-import pdfplumber
-import docx
+import pypdfium2 as pdfium
 import openpyxl
-import pptx
 import ebooklib
 from ebooklib import epub
 from striprtf.striprtf import rtf_to_text
-from bs4 import BeautifulSoup
-import re
+from lxml import etree, html as lxml_html
 from markdown_it import MarkdownIt
 import os
+import posixpath
+import shutil
+import subprocess
+import zipfile
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from odf import text, teletype
 from odf.opendocument import load
 
+from app.config import settings
+
+# tesseract's own OpenMP threading scales poorly; OCR parallelism comes from
+# the request threads and the parser worker pool instead. OpenMP reads this
+# when libtesseract loads, so it must be set before tesserocr is imported;
+# tesseract subprocesses inherit it.
+os.environ.setdefault("OMP_THREAD_LIMIT", str(settings.OCR_THREADS))
+
+# In-process tesseract when available; otherwise pytesseract runs the CLI
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# PDFs with at least this many pages are split across worker processes;
+# smaller ones cost more in IPC than they save
+PDF_PARALLEL_THRESHOLD = 8
+WORKER_POOL_SIZE = os.cpu_count() or 1
+
+# RTFs at least this large go to unrtf (C) when it's installed; striprtf's
+# per-character Python loop takes seconds on them
+RTF_UNRTF_THRESHOLD = 256 * 1024
+UNRTF = shutil.which("unrtf")
+
+# Scanned pages are rendered in grayscale at this resolution for OCR; more
+# doesn't help tesseract's accuracy but grows memory quadratically
+PDF_OCR_DPI = 150
+
+# PDFium is not thread-safe; serialize its use within a process
+_pdfium_lock = threading.Lock()
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+# Threads OCRing a document's scanned pages; tesserocr releases the GIL while
+# recognizing, and each thread keeps its own instance loaded
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+# Set in worker processes, which already keep every core busy
+_in_worker = False
+
+# One tesserocr instance per thread; an instance can't be shared concurrently
+_tess_local = threading.local()
+
+# Office Open XML namespaces
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
 # custom Exceptions
 class UnsupportedFileType(Exception):
     """Raised when the file type is not supported."""
@@ -32,60 +90,269 @@ def clean_text(text: str) -> str:
     - Removing extra whitespace and newlines.
     - Normalizing line breaks.
     """
-    # replace multiple newlines with a single one
-    text = re.sub(r'\n+', '\n', text)
-    # strip leading/trailing whitespace from each line
-    text = "\n".join([line.strip() for line in text.split('\n')])
-    # strip leading/trailing whitespace from the whole text
-    return text.strip()
+    # strip each line and drop blank ones in one pass of C-level iterators,
+    # with no Python frame per line
+    return "\n".join(filter(None, map(str.strip, text.splitlines())))
 
 def parse_pdf(file_path: str) -> str:
     """Extracts text from a PDF file, using OCR for image-based pages."""
     try:
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-                else:
-                    # if no text is extracted, use OCR
-                    image = page.to_image()
-                    text += pytesseract.image_to_string(image.original) + "\n"
-        return text
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                page_count = len(pdf)
+                # small documents are read from this same handle
+                if page_count < PDF_PARALLEL_THRESHOLD:
+                    texts, scanned = _read_pages(pdf, 0, page_count)
+            finally:
+                pdf.close()
+        if page_count < PDF_PARALLEL_THRESHOLD:
+            return "\n".join(_ocr_scanned_pages(texts, scanned))
+        return "\n".join(_extract_pages_parallel(file_path, page_count))
     except Exception as e:
         raise ParsingError(f"Error parsing PDF: {e}")
 
+def _tess_api():
+    """Gets this thread's tesserocr instance, loading the language model on first use."""
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        api = _tess_local.api = tesserocr.PyTessBaseAPI(lang="eng")
+    return api
+
+def _ocr_image(image) -> str:
+    """OCRs a PIL image or an image file path."""
+    if tesserocr is None:
+        return pytesseract.image_to_string(image)
+    api = _tess_api()
+    if isinstance(image, str):
+        api.SetImageFile(image)
+    else:
+        # hand tesseract the raw pixels; SetImage would round-trip them
+        # through an encoded image file
+        if image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGB")
+        bytes_per_pixel = len(image.getbands())
+        api.SetImageBytes(
+            image.tobytes(), image.width, image.height,
+            bytes_per_pixel, image.width * bytes_per_pixel,
+        )
+    return api.GetUTF8Text()
+
+def _get_ocr_pool() -> ThreadPoolExecutor:
+    """Gets the shared OCR thread pool, creating it on first use."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ThreadPoolExecutor(
+                max_workers=WORKER_POOL_SIZE, thread_name_prefix="ocr"
+            )
+        return _ocr_pool
+
+def _ocr_images(images: list) -> list:
+    """
+    OCRs several images, one text per image, without reloading tesseract per
+    image: in-process with tesserocr across the OCR threads, or as a single
+    CLI run over a multi-page TIFF.
+    """
+    if tesserocr is not None:
+        # worker processes already use every core
+        if _in_worker or len(images) == 1:
+            return [_ocr_image(image) for image in images]
+        return list(_get_ocr_pool().map(_ocr_image, images))
+    if len(images) == 1:
+        return [_ocr_image(images[0])]
+    # tesseract reads a multi-page TIFF in one process and separates the
+    # pages' text with form feeds
+    with tempfile.NamedTemporaryFile(suffix=".tif") as tiff:
+        images[0].save(tiff.name, save_all=True, append_images=images[1:])
+        pages = pytesseract.image_to_string(tiff.name).split("\f")
+    pages = pages[:len(images)]
+    return pages + [""] * (len(images) - len(pages))
+
+def _read_pages(pdf, start: int, stop: int) -> tuple:
+    """
+    Reads the text layer of pages [start, stop) of an open PDF, rendering
+    the pages without a usable one for OCR. Call with _pdfium_lock held.
+
+    Returns the page texts and a list of (page offset, image) to OCR.
+    """
+    texts = []
+    scanned = []
+    for index in range(start, stop):
+        # free each page as we go so memory doesn't grow with page count
+        page = pdf[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range()
+            finally:
+                textpage.close()
+            if not page_text.strip():
+                # if no text is extracted, use OCR
+                bitmap = page.render(scale=PDF_OCR_DPI / 72, grayscale=True)
+                scanned.append((len(texts), bitmap.to_pil()))
+                page_text = ""
+        finally:
+            page.close()
+        texts.append(page_text)
+    return texts, scanned
+
+def _ocr_scanned_pages(texts: list, scanned: list) -> list:
+    """Fills in the text of scanned pages, OCRing them together."""
+    # OCR outside the lock; it doesn't touch PDFium
+    if scanned:
+        ocr_texts = _ocr_images([image for _, image in scanned])
+        for (index, _), ocr_text in zip(scanned, ocr_texts):
+            texts[index] = ocr_text
+    return texts
+
+def _extract_pages(file_path: str, start: int, stop: int) -> list:
+    """Extracts text from pages [start, stop) of a PDF. Runs in worker processes."""
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            texts, scanned = _read_pages(pdf, start, stop)
+        finally:
+            pdf.close()
+    return _ocr_scanned_pages(texts, scanned)
+
+def _extract_pages_in_worker(file_path: str, start: int, stop: int) -> list:
+    """Runs _extract_pages in a worker process, with errors made picklable."""
+    try:
+        return _extract_pages(file_path, start, stop)
+    except Exception as e:
+        # some library exceptions can't be unpickled, which would break the pool
+        raise ParsingError(str(e)) from None
+
+def _init_worker():
+    """Warms a worker process up so its first page range doesn't pay for loading tesseract."""
+    global _in_worker
+    _in_worker = True
+    if tesserocr is not None:
+        _tess_api()
+
+def _get_worker_pool() -> ProcessPoolExecutor:
+    """Gets the shared parser worker pool, creating it on first use."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            # spawn, not fork: the server process has running threads
+            _worker_pool = ProcessPoolExecutor(
+                max_workers=WORKER_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _worker_pool
+
+def _discard_worker_pool(pool: ProcessPoolExecutor):
+    """Drops a broken pool so the next call starts a fresh one."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is pool:
+            _worker_pool = None
+
+def _extract_pages_parallel(file_path: str, page_count: int) -> list:
+    """Extracts text from all pages of a PDF, one contiguous page range per worker."""
+    step = -(-page_count // WORKER_POOL_SIZE)
+    pool = _get_worker_pool()
+    try:
+        futures = [
+            pool.submit(_extract_pages_in_worker, file_path, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        return [page_text for future in futures for page_text in future.result()]
+    except BrokenProcessPool:
+        # a worker died; start a fresh pool for the next document
+        _discard_worker_pool(pool)
+        raise
+
+def shutdown_worker_pool():
+    """Stops the parser worker processes and OCR threads, if any were started."""
+    global _worker_pool, _ocr_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown(cancel_futures=True)
+            _worker_pool = None
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(cancel_futures=True)
+            _ocr_pool = None
+
+def _iter_paragraphs(stream, paragraph_tag: str, text_tags: dict, run_tag: str = None):
+    """
+    Streams the text of each paragraph element in an XML part.
+
+    text_tags maps a tag to the text it contributes, or to None to use the
+    element's own text. With run_tag, only elements directly inside a run
+    count, so same-named elements in paragraph properties are skipped.
+    Finished paragraphs are cleared so memory stays flat.
+    """
+    for _, element in etree.iterparse(stream, tag=paragraph_tag):
+        yield "".join(
+            (node.text or "") if text_tags[node.tag] is None else text_tags[node.tag]
+            for node in element.iter(*text_tags)
+            if run_tag is None or node.getparent().tag == run_tag
+        )
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
 def parse_docx(file_path: str) -> str:
     """Extracts text from a DOCX file."""
     try:
-        doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        text_tags = {W_NS + "t": None, W_NS + "tab": "\t", W_NS + "br": "\n", W_NS + "cr": "\n"}
+        with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document:
+            # w:tab also defines tab stops under w:pPr/w:tabs; only run-level
+            # ones are text
+            return "\n".join(_iter_paragraphs(document, W_NS + "p", text_tags, run_tag=W_NS + "r"))
     except Exception as e:
         raise ParsingError(f"Error parsing DOCX: {e}")
 
+def _pptx_slide_parts(archive: zipfile.ZipFile) -> list:
+    """Lists a PPTX's slide parts in presentation order."""
+    with archive.open("ppt/_rels/presentation.xml.rels") as rels:
+        targets = {
+            rel.get("Id"): rel.get("Target")
+            for rel in etree.parse(rels).getroot().iter(PKG_REL_NS + "Relationship")
+        }
+    with archive.open("ppt/presentation.xml") as presentation:
+        slide_ids = etree.parse(presentation).getroot().iter(P_NS + "sldId")
+        parts = []
+        for slide_id in slide_ids:
+            target = targets[slide_id.get(R_NS + "id")]
+            # targets are relative to ppt/ unless absolute within the package
+            if target.startswith("/"):
+                parts.append(target.lstrip("/"))
+            else:
+                parts.append(posixpath.normpath(posixpath.join("ppt", target)))
+        return parts
+
 def parse_xlsx(file_path: str) -> str:
     """Extracts text from an XLSX file."""
     try:
-        workbook = openpyxl.load_workbook(file_path)
-        text = ""
-        for sheet in workbook.worksheets:
-            for row in sheet.iter_rows():
-                text += "\t".join([str(cell.value) for cell in row if cell.value]) + "\n"
-        return text
+        # stream raw cell values; formulas come back as their cached results
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = []
+            for sheet in workbook.worksheets:
+                for row in sheet.iter_rows(values_only=True):
+                    rows.append("\t".join(str(value) for value in row if value is not None))
+            return "\n".join(rows)
+        finally:
+            workbook.close()
     except Exception as e:
         raise ParsingError(f"Error parsing XLSX: {e}")
 
 def parse_pptx(file_path: str) -> str:
     """Extracts text from a PPTX file."""
     try:
-        presentation = pptx.Presentation(file_path)
-        text = ""
-        for slide in presentation.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-        return text
+        text_tags = {A_NS + "t": None, A_NS + "br": "\n"}
+        parts = []
+        with zipfile.ZipFile(file_path) as archive:
+            for slide_part in _pptx_slide_parts(archive):
+                with archive.open(slide_part) as slide:
+                    parts.extend(_iter_paragraphs(slide, A_NS + "p", text_tags))
+        return "\n".join(parts)
     except Exception as e:
         raise ParsingError(f"Error parsing PPTX: {e}")
 
@@ -100,9 +367,9 @@ def parse_text(file_path: str) -> str:
 def parse_csv(file_path: str) -> str:
     """Extracts text from a CSV file."""
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            return "\n".join(["\t".join(row) for row in reader])
+        # csv's reader is C; map keeps the per-row join in C as well
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            return "\n".join(map("\t".join, csv.reader(f)))
     except Exception as e:
         raise ParsingError(f"Error parsing CSV: {e}")
 
@@ -117,20 +384,41 @@ def parse_odt(file_path: str) -> str:
     except Exception as e:
         raise ParsingError(f"Error parsing ODT: {e}")
 
+def _unrtf_to_text(file_path: str) -> str:
+    """Extracts text from an RTF file with the unrtf CLI."""
+    result = subprocess.run(
+        [UNRTF, "--text", file_path], capture_output=True, check=True
+    )
+    output = result.stdout.decode("utf-8", errors="replace")
+    # drop unrtf's "###" comment header, which ends at a dashed rule
+    _, rule, body = output.partition("-----------------\n")
+    return body if rule else output
+
 def parse_rtf(file_path: str) -> str:
     """Extracts text from an RTF file."""
     try:
-        with open(file_path, "r") as f:
-            return rtf_to_text(f.read())
+        if UNRTF and os.path.getsize(file_path) >= RTF_UNRTF_THRESHOLD:
+            return _unrtf_to_text(file_path)
+        # RTF is 7-bit; other characters come as escapes, so latin-1 never fails
+        with open(file_path, "rb") as f:
+            return rtf_to_text(f.read().decode("latin-1"))
     except Exception as e:
         raise ParsingError(f"Error parsing RTF: {e}")
 
+def _html_to_text(content: bytes) -> str:
+    """Extracts the text of a UTF-8 HTML document with lxml's C parser."""
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    try:
+        return lxml_html.document_fromstring(content, parser=parser).text_content()
+    except etree.ParserError:
+        # raised for documents with no elements, e.g. only whitespace or comments
+        return ""
+
 def parse_html(file_path: str) -> str:
     """Extracts text from an HTML file."""
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            soup = BeautifulSoup(f, "html.parser")
-            return soup.get_text()
+        with open(file_path, "rb") as f:
+            return _html_to_text(f.read())
     except Exception as e:
         raise ParsingError(f"Error parsing HTML: {e}")
 
@@ -152,7 +440,7 @@ def parse_image(file_path: str) -> str:
     """Extracts text from an image file using OCR."""
     try:
 
-        return pytesseract.image_to_string(file_path)
+        return _ocr_image(file_path)
 
     except Exception as e:
         raise ParsingError(f"Error parsing image: {e}")
@@ -161,12 +449,11 @@ def parse_epub(file_path: str) -> str:
     """Extracts text from an EPUB file."""
     try:
         book = epub.read_epub(file_path)
-        text = ""
+        parts = []
         for item in book.get_items():
             if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), "html.parser")
-                text += soup.get_text() + "\n"
-        return text
+                parts.append(_html_to_text(item.get_content()))
+        return "\n".join(parts)
     except Exception as e:
         raise ParsingError(f"Error parsing EPUB: {e}")
 
@@ -175,17 +462,56 @@ def parse_markdown(file_path: str) -> str:
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             md = MarkdownIt()
-            html = md.render(f.read())
-            soup = BeautifulSoup(html, "html.parser")
-            return soup.get_text()
+            return _html_to_text(md.render(f.read()).encode("utf-8"))
     except Exception as e:
         raise ParsingError(f"Error parsing Markdown: {e}")
 
+# Parser dispatch tables, built once at import
+PARSERS = {
+    ".pdf": (parse_pdf, "application/pdf"),
+    ".docx": (parse_docx, "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    ".xlsx": (parse_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    ".pptx": (parse_pptx, "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+    ".txt": (parse_text, "text/plain"),
+    ".csv": (parse_csv, "text/csv"),
+    ".odt": (parse_odt, "application/vnd.oasis.opendocument.text"),
+    ".rtf": (parse_rtf, "application/rtf"),
+    ".html": (parse_html, "text/html"),
+    ".htm": (parse_html, "text/html"),
+    ".epub": (parse_epub, "application/epub+zip"),
+    ".md": (parse_markdown, "text/markdown"),
+    ".jpg": (parse_image, "image/jpeg"),
+    ".jpeg": (parse_image, "image/jpeg"),
+    ".png": (parse_image, "image/png"),
+    ".tif": (parse_image, "image/tiff"),
+    ".tiff": (parse_image, "image/tiff"),
+    ".bmp": (parse_image, "image/bmp"),
+    ".gif": (parse_image, "image/gif"),
+}
+
+MIME_PARSERS = {
+    "application/pdf": parse_pdf,
+    "image/jpeg": parse_image,
+    "image/png": parse_image,
+    "image/tiff": parse_image,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": parse_docx,
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": parse_xlsx,
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": parse_pptx,
+    "text/plain": parse_text,
+    "text/csv": parse_csv,
+    "application/vnd.oasis.opendocument.text": parse_odt,
+    "application/rtf": parse_rtf,
+    "text/rtf": parse_rtf,
+    "text/html": parse_html,
+    "application/epub+zip": parse_epub,
+    "text/markdown": parse_markdown,
+}
+
 # Main Processing Function
 def process_document(file_path: str) -> (str, str):
     """
-    Detects the MIME type of a file and calls the appropriate parser,
-    with fallbacks for ambiguous text types.
+    Picks a parser from the file extension, sniffing the MIME type from the
+    file content only when the extension is missing or unknown.
 
     Args:
         file_path: The path to the file to process.
@@ -197,41 +523,13 @@ def process_document(file_path: str) -> (str, str):
     if os.path.getsize(file_path) == 0:
         return "", "inode/x-empty"
 
-    mime_type = magic.from_file(file_path, mime=True)
     file_extension = os.path.splitext(file_path)[1].lower()
 
-    parser_dispatcher_mime = {
-        "application/pdf": parse_pdf,
-        "image/jpeg": parse_image,
-        "image/png": parse_image,
-        "image/tiff": parse_image,
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": parse_docx,
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": parse_xlsx,
-        "application/vnd.openxmlformats-officedocument.presentationml.presentation": parse_pptx,
-        "text/plain": parse_text,
-        "text/csv": parse_csv,
-        "application/vnd.oasis.opendocument.text": parse_odt,
-        "application/rtf": parse_rtf,
-        "text/rtf": parse_rtf,
-        "text/html": parse_html,
-        "application/epub+zip": parse_epub,
-        "text/markdown": parse_markdown,
-    }
-
-    parser = None
-
-    # fallback for ambiguous text types
-    if mime_type == "text/plain":
-        if file_extension == ".csv":
-            parser = parse_csv
-            mime_type = "text/csv"
-        elif file_extension == ".md":
-            parser = parse_markdown
-            mime_type = "text/markdown"
-        else:
-            parser = parse_text
-    elif mime_type in parser_dispatcher_mime:
-        parser = parser_dispatcher_mime[mime_type]
+    if file_extension in PARSERS:
+        parser, mime_type = PARSERS[file_extension]
+    else:
+        mime_type = magic.from_file(file_path, mime=True)
+        parser = MIME_PARSERS.get(mime_type)
 
     if parser:
         raw_text = parser(file_path)
@@ -0,0 +1,222 @@
+"""Usage tracking with batched, off-request database writes."""
+
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, insert, text, update
+
+from app.config import settings
+from app.core.security import utc_now
+from app.database import AsyncSessionLocal, engine
+from app.models import APIKey, UsageLog
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+USAGE_LOG_BATCH_SIZE = 100
+PARTITION_CHECK_INTERVAL = 6 * 60 * 60  # seconds
+
+USAGE_LOG_COLUMNS = (
+    "user_id", "api_key_id", "endpoint", "file_type", "file_size",
+    "processing_time", "tokens_used", "status_code", "error_message", "created_at",
+)
+
+# api_key_id -> most recent use; repeated uses between flushes coalesce
+_pending_last_used: dict[uuid.UUID, datetime] = {}
+
+# Usage log rows (in USAGE_LOG_COLUMNS order) waiting to be written
+_pending_usage_logs: asyncio.Queue = asyncio.Queue(maxsize=settings.USAGE_LOG_QUEUE_SIZE)
+
+
+def record_api_key_use(api_key_id: uuid.UUID, used_at: datetime):
+    """Buffer an API key's last-used timestamp for the next flush."""
+    _pending_last_used[api_key_id] = used_at
+
+
+async def flush_api_key_last_used() -> int:
+    """Write buffered last_used_at timestamps in bulk. Returns rows written."""
+    if not _pending_last_used:
+        return 0
+
+    rows = [
+        {"key_id": key_id, "used_at": used_at}
+        for key_id, used_at in _pending_last_used.items()
+    ]
+
+    # Core executemany: keys deleted since their last use simply match no row
+    api_keys = APIKey.__table__
+    stmt = (
+        update(api_keys)
+        .where(api_keys.c.id == bindparam("key_id"))
+        .values(last_used_at=bindparam("used_at"))
+    )
+    async with AsyncSessionLocal() as session:
+        for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+            await session.execute(stmt, rows[i:i + FLUSH_BATCH_SIZE])
+        await session.commit()
+
+    # Drop entries only once written, keeping any newer use recorded meanwhile
+    for row in rows:
+        if _pending_last_used.get(row["key_id"]) == row["used_at"]:
+            del _pending_last_used[row["key_id"]]
+
+    return len(rows)
+
+
+def record_usage_log(
+    user_id: uuid.UUID,
+    endpoint: str,
+    status_code: int,
+    api_key_id: Optional[uuid.UUID] = None,
+    file_type: Optional[str] = None,
+    file_size: Optional[int] = None,
+    processing_time: Optional[float] = None,
+    tokens_used: int = 1,
+    error_message: Optional[str] = None,
+) -> bool:
+    """
+    Queue a usage log row for the next flush.
+
+    Never blocks the request: when the queue is full the row is dropped and
+    False is returned.
+    """
+    row = (
+        user_id, api_key_id, endpoint, file_type, file_size,
+        processing_time, tokens_used, status_code, error_message, utc_now(),
+    )
+    try:
+        _pending_usage_logs.put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning("Usage log queue full, dropping entry for %s", endpoint)
+        return False
+    return True
+
+
+async def _write_usage_logs(rows: list[tuple]):
+    """Write a batch of usage log rows, with COPY when running on asyncpg."""
+    if engine.dialect.driver == "asyncpg":
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "usage_logs", records=rows, columns=USAGE_LOG_COLUMNS
+            )
+        return
+
+    # Core executemany on a bare connection; no ORM unit of work for log rows
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(UsageLog.__table__), [dict(zip(USAGE_LOG_COLUMNS, row)) for row in rows]
+        )
+
+
+async def flush_usage_logs() -> int:
+    """Write queued usage log rows in batches. Returns rows written."""
+    written = 0
+    while not _pending_usage_logs.empty():
+        batch = []
+        while len(batch) < FLUSH_BATCH_SIZE and not _pending_usage_logs.empty():
+            batch.append(_pending_usage_logs.get_nowait())
+        await _write_usage_logs(batch)
+        written += len(batch)
+    return written
+
+
+async def _collect_usage_log_batch(batch: list[tuple]):
+    """Wait for a usage log row, then gather more until the batch fills or lingers too long."""
+    loop = asyncio.get_running_loop()
+    batch.append(await _pending_usage_logs.get())
+    deadline = loop.time() + settings.USAGE_LOG_FLUSH_INTERVAL
+    while len(batch) < USAGE_LOG_BATCH_SIZE:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_pending_usage_logs.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+
+async def run_usage_log_writer():
+    """Write queued usage logs as they arrive until cancelled."""
+    batch: list[tuple] = []
+    try:
+        while True:
+            await _collect_usage_log_batch(batch)
+            try:
+                await _write_usage_logs(batch)
+            except Exception:
+                logger.exception("Failed to write %d usage logs", len(batch))
+            batch = []
+    finally:
+        # Drain everything still pending on shutdown
+        try:
+            if batch:
+                await _write_usage_logs(batch)
+            await flush_usage_logs()
+        except Exception:
+            logger.exception("Failed to write usage logs on shutdown")
+
+
+async def run_usage_flusher():
+    """Periodically flush buffered usage data until cancelled."""
+    try:
+        while True:
+            await asyncio.sleep(settings.USAGE_FLUSH_INTERVAL)
+            try:
+                await flush_api_key_last_used()
+            except Exception:
+                logger.exception("Failed to flush API key usage")
+    finally:
+        # Final flush on shutdown
+        try:
+            await flush_api_key_last_used()
+        except Exception:
+            logger.exception("Failed to flush API key usage on shutdown")
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+async def ensure_usage_log_partitions(months_ahead: int = 1) -> list[str]:
+    """
+    Create the monthly usage_logs partitions for this month and the next ones.
+
+    Rows for a month without a partition land in usage_logs_default, so each
+    partition is created before its month starts. Returns the partition names.
+    """
+    month = utc_now().date().replace(day=1)
+    names = []
+    async with engine.begin() as conn:
+        # Tables created by create_all in dev mode are not partitioned
+        partitioned = await conn.scalar(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('usage_logs')"
+        ))
+        if not partitioned:
+            return names
+        for _ in range(months_ahead + 1):
+            name = f"usage_logs_y{month:%Y}m{month:%m}"
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF usage_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+            names.append(name)
+            month = _next_month(month)
+    return names
+
+
+async def run_partition_maintenance():
+    """Keep upcoming usage_logs partitions created until cancelled."""
+    # Partitioning is a PostgreSQL-only schema feature
+    if engine.dialect.name != "postgresql":
+        return
+    while True:
+        try:
+            await ensure_usage_log_partitions()
+        except Exception:
+            logger.exception("Failed to create usage log partitions")
+        await asyncio.sleep(PARTITION_CHECK_INTERVAL)
@@ -71,16 +71,17 @@ function updateDashboard(data) {
         (data.average_response_time || 0).toFixed(0) + 'ms';
 }
 
-// Load users
-async function loadUsers() {
+// Load users (pass a cursor to append the next page)
+async function loadUsers(cursor = null) {
     try {
-        const response = await fetch(`${API_BASE}/admin/users`, {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`${API_BASE}/admin/users${query}`, {
             headers: getHeaders()
         });
         
         if (response.ok) {
-            const users = await response.json();
-            renderUsersTable(users);
+            const page = await response.json();
+            renderUsersTable(page.items, page.next_cursor, cursor !== null);
         }
     } catch (error) {
         console.error('Error loading users:', error);
@@ -88,15 +89,16 @@ async function loadUsers() {
 }
 
 // Render users table
-function renderUsersTable(users) {
+function renderUsersTable(users, nextCursor = null, append = false) {
     const tbody = document.getElementById('users-table');
+    document.getElementById('users-load-more')?.remove();
     
-    if (users.length === 0) {
+    if (users.length === 0 && !append) {
         tbody.innerHTML = '<tr><td colspan="6" class="loading">No users found</td></tr>';
         return;
     }
     
-    tbody.innerHTML = users.map(user => `
+    const rows = users.map(user => `
         <tr>
             <td>${user.email}</td>
             <td><span class="badge badge-${user.role === 'admin' ? 'warning' : 'success'}">${user.role}</span></td>
@@ -109,6 +111,18 @@ function renderUsersTable(users) {
             </td>
         </tr>
     `).join('');
+    
+    const loadMore = nextCursor ? `
+        <tr id="users-load-more">
+            <td colspan="6"><button class="btn-outline" onclick="loadUsers('${nextCursor}')">Load more</button></td>
+        </tr>
+    ` : '';
+    
+    if (append) {
+        tbody.insertAdjacentHTML('beforeend', rows + loadMore);
+    } else {
+        tbody.innerHTML = rows + loadMore;
+    }
 }
 
 // Refresh data
@@ -146,5 +160,5 @@ function deleteUser(userId) {
 // Auto-load users when users section is active
 document.addEventListener('DOMContentLoaded', function() {
     const usersNav = document.querySelector('[data-section="users"]');
-    usersNav.addEventListener('click', loadUsers);
+    usersNav.addEventListener('click', () => loadUsers());
 });
@@ -6,11 +6,13 @@ This script generates all necessary files for transforming the basic OCR service
 into a production-ready SaaS platform with authentication, API versioning,
 Swagger documentation, and a complete Docker Compose stack.
 
-Run with: python3 setup_enterprise.py
+Run with: python3 setup_enterprise.py [target-directory]
 """
 
 import os
-import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Define project structure
@@ -29,39 +31,8 @@ PROJECT_DIRS = [
     "nginx",
 ]
 
-def create_directories():
-    """Create all necessary directories."""
-    print("Creating directory structure...")
-    for dir_path in PROJECT_DIRS:
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
-        # Create __init__.py for Python packages
-        if dir_path.startswith("app/") or dir_path.startswith("tests/"):
-            init_file = Path(dir_path) / "__init__.py"
-            if not init_file.exists():
-                init_file.write_text("# Auto-generated\\n")
-    print("✓ Directory structure created")
-
-def move_existing_files():
-    """Move existing files to the new structure."""
-    print("Reorganizing existing files...")
-    
-    # Move parsers.py to app/services/
-    if os.path.exists("parsers.py"):
-        shutil.move("parsers.py", "app/services/parsers.py")
-        print("  ✓ Moved parsers.py to app/services/")
-    
-    # Archive old main.py
-    if os.path.exists("main.py"):
-        shutil.move("main.py", "main.py.old")
-        print("  ✓ Archived old main.py")
-    
-    print("✓ Files reorganized")
-
-def update_requirements():
-    """Update requirements.txt with enterprise dependencies."""
-    print("Updating requirements.txt...")
-    
-    requirements = """# Core Framework
+# Generated file contents, encoded once at import
+_REQUIREMENTS_TXT = """# Core Framework
 fastapi==0.109.2
 uvicorn[standard]==0.27.1
 python-multipart==0.0.9
@@ -70,7 +41,6 @@ python-multipart==0.0.9
 sqlalchemy[asyncio]==2.0.25
 asyncpg==0.29.0
 alembic==1.13.1
-psycopg2-binary==2.9.9
 
 # Authentication & Security
 python-jose[cryptography]==3.3.0
@@ -93,7 +63,6 @@ Pillow==10.2.0
 lxml==5.1.0
 odfpy==1.4.1
 markdown-it-py==3.0.0
-opencv-python==4.9.0.80
 
 # Async & Background Tasks
 celery==5.3.6
@@ -104,23 +73,17 @@ httpx==0.26.0
 
 # Monitoring & Logging
 prometheus-client==0.19.0
+""".encode("utf-8")
+
+_REQUIREMENTS_DEV_TXT = """-r requirements.txt
 
 # Testing
 pytest==8.0.0
 pytest-asyncio==0.23.4
 pytest-cov==4.1.0
-"""
-    
-    with open("requirements.txt", "w") as f:
-        f.write(requirements)
-    
-    print("✓ Requirements updated")
+""".encode("utf-8")
 
-def create_docker_compose():
-    """Create Docker Compose configuration."""
-    print("Creating Docker Compose stack...")
-    
-    compose_content = """version: '3.8'
+_COMPOSE_YML = """version: '3.8'
 
 services:
   # PostgreSQL Database
@@ -231,18 +194,9 @@ volumes:
 networks:
   ocr-network:
     driver: bridge
-"""
-    
-    with open("docker-compose.yml", "w") as f:
-        f.write(compose_content)
-    
-    print("✓ Docker Compose configuration created")
+""".encode("utf-8")
 
-def create_env_example():
-    """Create .env.example file."""
-    print("Creating .env.example...")
-    
-    env_content = """# Application Settings
+_ENV_EXAMPLE = """# Application Settings
 APP_NAME=Enterprise OCR API
 DEBUG=False
 
@@ -273,18 +227,22 @@ CELERY_RESULT_BACKEND=redis://redis:6379/2
 
 # Logging
 LOG_LEVEL=INFO
-"""
-    
-    with open(".env.example", "w") as f:
-        f.write(env_content)
-    
-    print("✓ .env.example created")
-
-def create_readme():
-    """Create comprehensive README."""
-    print("Creating README.md...")
-    
-    readme_content = """# Enterprise OCR Service
+""".encode("utf-8")
+
+# frontend/ stays in the build context: the API serves it unless a proxy does
+_DOCKERIGNORE = """.git
+.venv
+.env
+.pytest_cache
+**/__pycache__
+**/*.pyc
+tests/
+docs/
+*.md
+main.py.old
+""".encode("utf-8")
+
+_README_MD = """# Enterprise OCR Service
 
 A production-grade, enterprise-ready OCR (Optical Character Recognition) SaaS platform built with FastAPI, PostgreSQL, Redis, and Celery.
 
@@ -456,7 +414,8 @@ ocr-service/
 ├── nginx/                 # Nginx configuration
 ├── docker-compose.yml     # Docker Compose stack
 ├── Dockerfile             # Application container
-└── requirements.txt       # Python dependencies
+├── requirements.txt       # Python dependencies
+└── requirements-dev.txt   # Plus test dependencies
 ```
 
 ## Development
@@ -469,7 +428,7 @@ python -m venv venv
 source venv/bin/activate  # On Windows: venv\\Scripts\\activate
 
 # Install dependencies
-pip install -r requirements.txt
+pip install -r requirements-dev.txt
 
 # Run database
 docker-compose up -d postgres redis
@@ -546,27 +505,131 @@ For issues and questions, please contact [your-email@example.com]
 ---
 
 **Built with ❤️ using FastAPI, PostgreSQL, Redis, and Docker**
-"""
+""".encode("utf-8")
+
+# (path, contents, label) of every generated file; the image installs only
+# requirements.txt, so test tools live in requirements-dev.txt
+GENERATED_FILES = [
+    ("requirements.txt", _REQUIREMENTS_TXT, "requirements.txt"),
+    ("requirements-dev.txt", _REQUIREMENTS_DEV_TXT, "requirements-dev.txt"),
+    ("docker-compose.yml", _COMPOSE_YML, "Docker Compose configuration"),
+    (".dockerignore", _DOCKERIGNORE, ".dockerignore"),
+    (".env.example", _ENV_EXAMPLE, ".env.example"),
+    ("README.md", _README_MD, "README.md"),
+]
+
+# Generated files are written concurrently; keep their progress lines whole
+_print_lock = threading.Lock()
+
+def log(message: str):
+    """Print a progress line without interleaving with other threads."""
+    with _print_lock:
+        print(message)
+
+def write_file(path: Path, data: bytes) -> bool:
+    """
+    Write a whole file with one open and, for small files, one write.
+    
+    A file that already holds exactly data is left alone, keeping its mtime
+    (and Docker's layer cache) intact; returns whether anything was written.
+    """
+    try:
+        with open(path, "rb") as f:
+            # one byte extra tells a longer file apart from an equal one
+            if f.read(len(data) + 1) == data:
+                return False
+    except FileNotFoundError:
+        pass
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return True
+
+def create_directories(root: Path = Path(".")):
+    """Create all necessary directories."""
+    print("Creating directory structure...")
+    root.mkdir(parents=True, exist_ok=True)
+    # Make each directory once, parents first; shared parents like app/ are
+    # not stat'ed again for every child
+    created = set()
+    for dir_path in PROJECT_DIRS:
+        parts = Path(dir_path).parts
+        for depth in range(1, len(parts) + 1):
+            path = os.path.join(root, *parts[:depth])
+            if path in created:
+                continue
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
+            created.add(path)
+        # Create __init__.py for Python packages, leaving existing ones alone
+        if dir_path.startswith("app/") or dir_path.startswith("tests/"):
+            try:
+                fd = os.open(
+                    os.path.join(root, dir_path, "__init__.py"),
+                    os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                )
+            except FileExistsError:
+                continue
+            try:
+                os.write(fd, b"# Auto-generated\\n")
+            finally:
+                os.close(fd)
+    print("✓ Directory structure created")
+
+def move_existing_files(root: Path = Path(".")):
+    """Move existing files to the new structure."""
+    print("Reorganizing existing files...")
     
-    with open("README.md", "w") as f:
-        f.write(readme_content)
+    # Everything stays inside root, so a rename is enough; a missing source
+    # just means there is nothing to move
+    
+    # Move parsers.py to app/services/
+    try:
+        os.replace(root / "parsers.py", root / "app/services/parsers.py")
+        print("  ✓ Moved parsers.py to app/services/")
+    except FileNotFoundError:
+        pass
     
-    print("✓ README.md created")
+    # Archive old main.py
+    try:
+        os.replace(root / "main.py", root / "main.py.old")
+        print("  ✓ Archived old main.py")
+    except FileNotFoundError:
+        pass
+    
+    print("✓ Files reorganized")
+
+def generate_file(root: Path, name: str, data: bytes, label: str):
+    """Write one generated file under root."""
+    if write_file(root / name, data):
+        log(f"✓ {label} created")
+    else:
+        log(f"✓ {label} unchanged")
 
-def main():
-    """Main setup function."""
+def main(root: Path = Path(".")):
+    """Main setup function; generates the project under root."""
     print("=" * 60)
     print("Enterprise OCR SaaS Setup")
     print("=" * 60)
     print()
     
     try:
-        create_directories()
-        move_existing_files()
-        update_requirements()
-        create_docker_compose()
-        create_env_example()
-        create_readme()
+        # These two reshape the tree, so they run first and in order
+        create_directories(root)
+        move_existing_files(root)
+        
+        # Each generated file is independent of the others
+        print("Generating project files...")
+        with ThreadPoolExecutor(max_workers=len(GENERATED_FILES)) as executor:
+            # list() re-raises the first write error, if any
+            list(executor.map(lambda spec: generate_file(root, *spec), GENERATED_FILES))
         
         print()
         print("=" * 60)
@@ -575,7 +638,7 @@ def main():
         print()
         print("Next steps:")
         print("1. Review and customize .env.example, then copy to .env")
-        print("2. Install Python dependencies: pip install -r requirements.txt")
+        print("2. Install Python dependencies: pip install -r requirements-dev.txt")
         print("3. Run the comprehensive setup: python scripts/complete_setup.py")
         print("4. Start Docker services: docker-compose up -d")
         print("5. Run migrations: docker-compose exec api alembic upgrade head")
@@ -587,4 +650,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else Path("."))
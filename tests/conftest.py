@@ -1,10 +1,19 @@
 """Pytest configuration and fixtures for testing."""
 
+import os
+
+# Cheapest argon2 parameters; must be set before app.config is imported.
+# Hashes stay real argon2id, just fast to compute and verify.
+os.environ.setdefault("ARGON2_MEMORY_COST", "8")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
 import pytest
-import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
@@ -15,86 +24,148 @@ from app.core.security import hash_password
 # Test database URL (in-memory SQLite for testing)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# Password hashes for the fixture users, computed once per session; the salt
+# is part of the hash, so reusing them changes nothing for the tests
+TEST_USER_PASSWORD_HASH = hash_password("testpass123")
+ADMIN_USER_PASSWORD_HASH = hash_password("adminpass123")
 
-@pytest_asyncio.fixture
-async def test_db():
-    """Create a test database."""
+
+@pytest.fixture(scope="session")
+async def test_engine():
+    """Create the test database schema once per session."""
+    # One shared connection, so the in-memory database outlives each test
     engine = create_async_engine(
         TEST_DATABASE_URL,
-        poolclass=NullPool,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
     )
     
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # pysqlite defers BEGIN on its own, which breaks savepoints; let
+    # SQLAlchemy emit it so each test's transaction really rolls back
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
     
-    async_session = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
+    @event.listens_for(engine.sync_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    yield async_session
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
-    await engine.dispose()
-
-
-@pytest_asyncio.fixture
+    # Dispose even if setup fails; a live aiosqlite thread would hang pytest
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        yield engine
+        
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def test_db(test_engine):
+    """Create a test database, rolled back once the test finishes."""
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        
+        # Sessions commit and roll back to savepoints inside the test's
+        # transaction, so nothing a test writes reaches the next one
+        async_session = async_sessionmaker(
+            conn,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        
+        yield async_session
+        
+        await transaction.rollback()
+
+
+@pytest.fixture
 async def db_session(test_db):
     """Get database session for testing."""
     async with test_db() as session:
         yield session
 
 
-@pytest_asyncio.fixture
-async def client(test_db):
-    """Create test client with test database."""
-    async def override_get_db():
-        async with test_db() as session:
-            yield session
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
+@pytest.fixture(scope="session")
+async def http_client():
+    """Create the test client once per session."""
     async with AsyncClient(
         transport=ASGITransport(app=app),
         base_url="http://test"
     ) as ac:
         yield ac
+
+
+@pytest.fixture
+async def client(test_db, http_client):
+    """Get the test client, wired to the test database."""
+    async def override_get_db():
+        # Mirror app.database.get_db: commit once the handler succeeds
+        async with test_db() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
     
+    app.dependency_overrides[get_db] = override_get_db
+    
+    yield http_client
+    
+    # Login responses set cookies; don't carry them into the next test
+    http_client.cookies.clear()
     app.dependency_overrides.clear()
 
 
-@pytest_asyncio.fixture
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed while the test runs."""
+    statements = []
+    
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(Engine, "after_cursor_execute", count)
+    yield statements
+    event.remove(Engine, "after_cursor_execute", count)
+
+
+@pytest.fixture
 async def test_user(db_session):
     """Create a test user."""
     user = User(
         email="testuser@example.com",
-        hashed_password=hash_password("testpass123"),
+        hashed_password=TEST_USER_PASSWORD_HASH,
         role="user",
         is_active=True,
     )
     db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    # Visible to the app's sessions on the shared connection; rolled back
+    # with the test's transaction
+    await db_session.flush()
     return user
 
 
-@pytest_asyncio.fixture
+@pytest.fixture
 async def admin_user(db_session):
     """Create an admin user."""
     user = User(
         email="admin@example.com",
-        hashed_password=hash_password("adminpass123"),
+        hashed_password=ADMIN_USER_PASSWORD_HASH,
         role="admin",
         is_active=True,
     )
     db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    await db_session.flush()
     return user
 
 
-@pytest_asyncio.fixture
+@pytest.fixture
 async def user_token(client, test_user):
     """Get auth token for test user."""
     response = await client.post(
@@ -104,7 +175,7 @@ async def user_token(client, test_user):
     return response.json()["access_token"]
 
 
-@pytest_asyncio.fixture
+@pytest.fixture
 async def admin_token(client, admin_user):
     """Get auth token for admin user."""
     response = await client.post(
@@ -112,3 +183,14 @@ async def admin_token(client, admin_user):
         json={"email": "admin@example.com", "password": "adminpass123"}
     )
     return response.json()["access_token"]
+
+
+@pytest.fixture
+async def created_api_key(client, user_token):
+    """Create an API key for the test user."""
+    response = await client.post(
+        "/api/v1/keys/create",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"name": "Test Key"}
+    )
+    return response.json()
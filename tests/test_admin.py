@@ -1,9 +1,6 @@
 """Tests for admin endpoints."""
 
-import pytest
 
-
-@pytest.mark.asyncio
 async def test_list_users_as_admin(client, admin_token):
     """Test listing all users as admin."""
     response = await client.get(
@@ -12,11 +9,39 @@ async def test_list_users_as_admin(client, admin_token):
     )
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) > 0
+    assert data["next_cursor"] is None
+
+
+async def test_list_users_paginated(client, admin_token, test_user):
+    """Test paging through users with a cursor."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = await client.get("/api/v1/admin/users?limit=1", headers=headers)
+    assert first.status_code == 200
+    first_page = first.json()
+    assert len(first_page["items"]) == 1
+    assert first_page["next_cursor"]
+    
+    second = await client.get(
+        f"/api/v1/admin/users?limit=1&cursor={first_page['next_cursor']}",
+        headers=headers
+    )
+    second_page = second.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["items"][0]["id"] != first_page["items"][0]["id"]
+    assert second_page["next_cursor"] is None
+
+
+async def test_list_users_invalid_cursor(client, admin_token):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get(
+        "/api/v1/admin/users?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 400
 
 
-@pytest.mark.asyncio
 async def test_list_users_as_regular_user(client, user_token):
     """Test that regular users can't access admin endpoints."""
     response = await client.get(
@@ -26,7 +51,6 @@ async def test_list_users_as_regular_user(client, user_token):
     assert response.status_code == 403
 
 
-@pytest.mark.asyncio
 async def test_get_system_stats(client, admin_token):
     """Test getting system statistics."""
     response = await client.get(
@@ -1,9 +1,6 @@
 """Tests for API key endpoints."""
 
-import pytest
 
-
-@pytest.mark.asyncio
 async def test_create_api_key(client, user_token):
     """Test creating an API key."""
     response = await client.post(
@@ -19,7 +16,6 @@ async def test_create_api_key(client, user_token):
     assert data["api_key"].startswith("ocr_")
 
 
-@pytest.mark.asyncio
 async def test_create_api_key_unauthorized(client):
     """Test creating API key without auth."""
     response = await client.post(
@@ -29,37 +25,22 @@ async def test_create_api_key_unauthorized(client):
     assert response.status_code == 403
 
 
-@pytest.mark.asyncio
-async def test_list_api_keys(client, user_token):
+async def test_list_api_keys(client, user_token, created_api_key):
     """Test listing user's API keys."""
-    # Create a key first
-    await client.post(
-        "/api/v1/keys/create",
-        headers={"Authorization": f"Bearer {user_token}"},
-        json={"name": "Test Key"}
-    )
-    
     response = await client.get(
         "/api/v1/keys/",
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
     assert len(data) > 0
     assert "api_key" not in data[0]  # Hashed key not returned
 
 
-@pytest.mark.asyncio
-async def test_delete_api_key(client, user_token):
+async def test_delete_api_key(client, user_token, created_api_key):
     """Test deleting an API key."""
-    # Create a key first
-    create_response = await client.post(
-        "/api/v1/keys/create",
-        headers={"Authorization": f"Bearer {user_token}"},
-        json={"name": "Test Key"}
-    )
-    key_id = create_response.json()["id"]
+    key_id = created_api_key["id"]
     
     # Delete it
     response = await client.delete(
@@ -73,5 +54,26 @@ async def test_delete_api_key(client, user_token):
         "/api/v1/keys/",
         headers={"Authorization": f"Bearer {user_token}"}
     )
-    keys = list_response.json()
+    keys = list_response.json()["items"]
     assert all(k["id"] != key_id for k in keys)
+
+
+async def test_list_api_keys_query_count(client, user_token, query_counter):
+    """Test that listing API keys does not issue a query per key."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    
+    async def count_list_queries():
+        query_counter.clear()
+        response = await client.get("/api/v1/keys/", headers=headers)
+        assert response.status_code == 200
+        return len(query_counter), len(response.json()["items"])
+    
+    await client.post("/api/v1/keys/create", headers=headers, json={"name": "Key 0"})
+    queries_one, keys = await count_list_queries()
+    assert keys == 1
+    
+    for i in range(1, 5):
+        await client.post("/api/v1/keys/create", headers=headers, json={"name": f"Key {i}"})
+    queries_many, keys = await count_list_queries()
+    assert keys == 5
+    assert queries_many <= queries_one
@@ -1,9 +1,11 @@
 """Tests for authentication endpoints."""
 
-import pytest
+from sqlalchemy import select
+
+from app.models import User
+from app.core.security import pwd_context
 
 
-@pytest.mark.asyncio
 async def test_register_new_user(client):
     """Test user registration."""
     response = await client.post(
@@ -19,7 +21,6 @@ async def test_register_new_user(client):
     assert "hashed_password" not in data
 
 
-@pytest.mark.asyncio
 async def test_register_duplicate_email(client, test_user):
     """Test registering with existing email."""
     response = await client.post(
@@ -30,7 +31,6 @@ async def test_register_duplicate_email(client, test_user):
     assert "already registered" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 async def test_login_success(client, test_user):
     """Test successful login."""
     response = await client.post(
@@ -43,7 +43,6 @@ async def test_login_success(client, test_user):
     assert data["token_type"] == "bearer"
 
 
-@pytest.mark.asyncio
 async def test_login_wrong_password(client, test_user):
     """Test login with wrong password."""
     response = await client.post(
@@ -54,7 +53,6 @@ async def test_login_wrong_password(client, test_user):
     assert "incorrect" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 async def test_login_nonexistent_user(client):
     """Test login with non-existent email."""
     response = await client.post(
@@ -64,7 +62,29 @@ async def test_login_nonexistent_user(client):
     assert response.status_code == 401
 
 
-@pytest.mark.asyncio
+async def test_login_upgrades_bcrypt_hash(client, db_session):
+    """Test that a legacy bcrypt hash is replaced with argon2id on login."""
+    db_session.add(User(
+        email="legacy@example.com",
+        hashed_password=pwd_context.handler("bcrypt").hash("legacypass123"),
+        role="user",
+        is_active=True,
+    ))
+    await db_session.commit()
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "legacy@example.com", "password": "legacypass123"}
+    )
+    assert response.status_code == 200
+    
+    db_session.expire_all()
+    hashed = await db_session.scalar(
+        select(User.hashed_password).where(User.email == "legacy@example.com")
+    )
+    assert hashed.startswith("$argon2id$")
+
+
 async def test_get_current_user(client, user_token):
     """Test getting current user info."""
     response = await client.get(
@@ -77,7 +97,6 @@ async def test_get_current_user(client, user_token):
     assert data["role"] == "user"
 
 
-@pytest.mark.asyncio
 async def test_get_current_user_unauthorized(client):
     """Test getting user info without auth."""
     response = await client.get("/api/v1/auth/me")
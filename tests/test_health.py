@@ -1,9 +1,6 @@
 """Tests for health check endpoints."""
 
-import pytest
 
-
-@pytest.mark.asyncio
 async def test_basic_health_check(client):
     """Test basic health endpoint."""
     response = await client.get("/health")
@@ -14,7 +11,6 @@ async def test_basic_health_check(client):
     assert "timestamp" in data
 
 
-@pytest.mark.asyncio
 async def test_detailed_health_check(client):
     """Test detailed health endpoint."""
     response = await client.get("/health/details")
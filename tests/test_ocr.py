@@ -1,10 +1,11 @@
 """Tests for OCR extraction endpoints."""
 
-import pytest
+import uuid
 from io import BytesIO
 
+from app.core.cache import ocr_result_cache
+
 
-@pytest.mark.asyncio
 async def test_ocr_extract_unauthorized(client):
     """Test OCR extraction without API key."""
     # Create a simple text file
@@ -18,16 +19,9 @@ async def test_ocr_extract_unauthorized(client):
     assert response.status_code == 403
 
 
-@pytest.mark.asyncio
-async def test_ocr_extract_with_api_key(client, user_token):
+async def test_ocr_extract_with_api_key(client, created_api_key):
     """Test OCR extraction with valid API key."""
-    # First create an API key
-    key_response = await client.post(
-        "/api/v1/keys/create",
-        headers={"Authorization": f"Bearer {user_token}"},
-        json={"name": "Test OCR Key", "rate_limit": 100}
-    )
-    api_key = key_response.json()["api_key"]
+    api_key = created_api_key["key"]
     
     # Create a simple text file
     file_content = b"Test OCR content"
@@ -48,3 +42,11 @@ async def test_ocr_extract_with_api_key(client, user_token):
         data = response.json()
         assert "filename" in data
         assert "content" in data
+
+
+def test_ocr_result_cache_key_is_per_user():
+    """Test that cached OCR results are never shared between users."""
+    first_user, second_user = uuid.uuid4(), uuid.uuid4()
+    digest = "0" * 64
+    assert ocr_result_cache.key(first_user, digest, ".PDF") == ocr_result_cache.key(first_user, digest, ".pdf")
+    assert ocr_result_cache.key(first_user, digest, ".pdf") != ocr_result_cache.key(second_user, digest, ".pdf")
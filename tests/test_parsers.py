@@ -0,0 +1,29 @@
+"""Tests for document parsers."""
+
+import zipfile
+
+from app.services.parsers import parse_docx, parse_html
+
+
+def test_parse_docx_ignores_tab_stop_definitions(tmp_path):
+    """Test that tab stops in paragraph properties don't add tabs to the text."""
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        "<w:body><w:p>"
+        '<w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        "<w:r><w:t>Hello</w:t><w:tab/><w:t>World</w:t></w:r>"
+        "</w:p></w:body></w:document>"
+    )
+    path = tmp_path / "tabs.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+    assert parse_docx(str(path)) == "Hello\tWorld"
+
+
+def test_parse_html_without_elements(tmp_path):
+    """Test that HTML with only comments or whitespace yields no text."""
+    for content in (b"<!-- nothing here -->", b"  \n "):
+        path = tmp_path / "empty.html"
+        path.write_bytes(content)
+        assert parse_html(str(path)) == ""
@@ -1,9 +1,6 @@
 """Tests for user management endpoints."""
 
-import pytest
 
-
-@pytest.mark.asyncio
 async def test_update_user_profile(client, user_token):
     """Test updating user profile."""
     response = await client.put(
@@ -16,7 +13,6 @@ async def test_update_user_profile(client, user_token):
     assert data["quota_limit"] == 5000
 
 
-@pytest.mark.asyncio
 async def test_update_user_unauthorized(client):
     """Test updating profile without auth."""
     response = await client.put(